@@ -0,0 +1,94 @@
+import atexit
+import collections
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime
+
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+
+class RingBufferHandler(logging.Handler):
+    """Guarda os últimos `capacity` registros para a interface, com um número de sequência crescente.
+
+    A sequência é o cursor usado pelo /get_results e pelos eventos `log` do /events; registros
+    que saíram do buffer simplesmente deixam de ser retornados.
+    """
+
+    def __init__(self, capacity, on_record=None):
+        super().__init__()
+        self.records = collections.deque(maxlen=capacity)
+        self.next_seq = 0
+        self.on_record = on_record
+        self.buffer_lock = threading.Lock()
+
+    def emit(self, record):
+        entry = {
+            "message": record.getMessage(),
+            "level": LEVEL_NAMES.get(record.levelno, record.levelname.lower()),
+            "timestamp": datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with self.buffer_lock:
+            entry["index"] = self.next_seq
+            self.next_seq += 1
+            self.records.append(entry)
+        if self.on_record:
+            self.on_record(entry)
+
+    def since(self, seq):
+        """Retorna (registros com índice >= seq ainda no buffer, próximo cursor)."""
+        with self.buffer_lock:
+            if not self.records:
+                return [], self.next_seq
+            start = max(seq - self.records[0]["index"], 0)
+            return list(itertools.islice(self.records, start, None)), self.next_seq
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps({
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": LEVEL_NAMES.get(record.levelno, record.levelname.lower()),
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }, ensure_ascii=False)
+
+
+def setup(name, level, buffer_size, log_file=None, max_bytes=0, backups=0, on_record=None):
+    """Configura o logger da aplicação e retorna (logger, buffer da interface).
+
+    O buffer recebe os registros na hora (é só um append em memória); console e arquivo JSONL
+    rotativo ficam atrás de uma fila e são escritos por uma thread própria, fora do caminho da busca.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(LEVELS.get(level, logging.INFO))
+    logger.propagate = False
+
+    ring = RingBufferHandler(buffer_size, on_record)
+    logger.addHandler(ring)
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    outputs = [console]
+    if log_file:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        outputs.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *outputs, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return logger, ring
@@ -0,0 +1,224 @@
+"""Mede o motor de busca de ponta a ponta contra o servidor local de bench/standin.py.
+
+Uso (a partir da raiz do projeto):
+
+    python -m bench.engine_bench [--cities 3] [--pages 5] [--threads 4] [--latency 0.05] [--error-rate 0.0]
+                                 [--save resultado.json] [--baseline anterior.json]
+
+Sobe o servidor local num processo separado, aponta o buscador e a API de CNPJ para ele
+(VAX_SEARCH_URL / VAX_CNPJ_API_URL), roda uma busca completa pelo crawler.manage_search e mostra
+páginas/s, resultados/s, p50/p99 de cada estágio e o pico de memória (RSS). Com --save o
+resultado vai para um JSON; com --baseline ele é comparado com um JSON salvo antes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STAGES = ["serp_fetch", "serp_parse", "detail_fetch", "detail_parse", "extract", "cnpj_api"]
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, round(q * (len(values) - 1)))]
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"servidor local não respondeu na porta {port}")
+
+
+def start_standin(args):
+    command = [sys.executable, "-m", "bench.standin", "--port", str(args.port),
+               "--latency", str(args.latency), "--error-rate", str(args.error_rate),
+               "--pages-per-query", str(args.pages_per_query), "--detail-hosts", str(args.detail_hosts)]
+    if args.serp_latency is not None:
+        command += ["--serp-latency", str(args.serp_latency)]
+    if args.api_latency is not None:
+        command += ["--api-latency", str(args.api_latency)]
+    server = subprocess.Popen(command, cwd=ROOT)
+    try:
+        wait_for_port(args.port)
+    except RuntimeError:
+        server.kill()
+        raise
+    return server
+
+
+def configure(args, workdir):
+    """Ajusta o ambiente antes de importar o app: caches vazios e endereços do servidor local."""
+    api_host = "127.0.0.2" if args.detail_hosts else "127.0.0.1"
+    os.environ.update({
+        "VAX_SEARCH_URL": f"http://127.0.0.1:{args.port}/search",
+        "VAX_CNPJ_API_URL": f"http://{api_host}:{args.port}/api/cnpj/v1",
+        "VAX_CNPJ_CACHE_PATH": os.path.join(workdir, "cnpj_cache.sqlite3"),
+        "VAX_FRONTIER_PATH": os.path.join(workdir, "frontier.sqlite3"),
+        "VAX_LOG_FILE": "",
+        "VAX_LOG_LEVEL": args.log_level,
+    })
+    if not args.rate_limits:
+        # O servidor local responde em endereços que caem no orçamento padrão; sem limite, mede-se o motor
+        os.environ["VAX_RATE_LIMIT_DEFAULT"] = "0"
+
+
+def instrument(crawler, timings):
+    """Envolve os pontos de cada estágio do motor para registrar a duração de cada chamada."""
+    # O /metrics só guarda histogramas; aqui cada duração é guardada para calcular p50/p99 exatos
+    fetch = crawler.CrawlEngine.fetch
+    parse = crawler.extractor.parse
+    extract = crawler.extractor.extract_from_text
+    serp = crawler.parsers.backend.serp
+    fetch_cnpj_details = crawler.fetch_cnpj_details
+
+    def timed(stage, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[stage].append(time.perf_counter() - start)
+        return wrapper
+
+    def timed_async(stage, func):
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                timings[stage or args[-1]].append(time.perf_counter() - start)
+        return wrapper
+
+    # CrawlEngine.fetch(self, url, stage) informa o estágio no último argumento
+    crawler.CrawlEngine.fetch = timed_async(None, fetch)
+    crawler.extractor.parse = timed("detail_parse", parse)
+    crawler.extractor.extract_from_text = timed("extract", extract)
+    crawler.parsers.backend.serp = timed("serp_parse", serp)
+    crawler.fetch_cnpj_details = timed_async("cnpj_api", fetch_cnpj_details)
+
+
+def run_search(args):
+    import crawler
+    import shared
+    from frontier import Frontier
+    from regions import states_cities
+
+    shared.setup_logging()
+    timings = {stage: [] for stage in STAGES}
+    instrument(crawler, timings)
+
+    cities = states_cities[args.state][:args.cities]
+    job = shared.jobs.create(args.search_term, cities, args.state, args.pages, args.threads,
+                             key=Frontier.search_key(args.search_term, args.state, cities))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    crawler.start_search(job).result()
+    elapsed = time.perf_counter() - start
+    asyncio.run_coroutine_threadsafe(crawler.get_transport().close(), crawler.get_crawl_loop()).result()
+
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    pages = len(timings["serp_fetch"])
+    return {
+        "params": {key: value for key, value in vars(args).items() if key not in ("save", "baseline")},
+        "parser_backend": crawler.parsers.backend.name,
+        "elapsed": elapsed,
+        "pages": pages,
+        "results": len(job.results),
+        "pages_per_sec": pages / elapsed if elapsed else 0,
+        "results_per_sec": len(job.results) / elapsed if elapsed else 0,
+        "stages": {stage: {"count": len(values), "p50": percentile(values, 0.5), "p99": percentile(values, 0.99)}
+                   for stage, values in timings.items()},
+        "rss_start_mb": rss_before * scale / 2 ** 20,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20,
+    }
+
+
+def ms(value):
+    return f"{value * 1000:.1f}" if value is not None else "-"
+
+
+def change(current, previous, lower_is_better=False):
+    if current is None or not previous:
+        return ""
+    delta = (current - previous) / previous * 100
+    better = delta < 0 if lower_is_better else delta > 0
+    return f"   {delta:+.1f}% {'melhor' if better else 'pior'}" if abs(delta) >= 0.05 else "   igual"
+
+
+def report(result, baseline=None):
+    base = baseline or {}
+    print(f"backend de parsing: {result['parser_backend']}   tempo total: {result['elapsed']:.2f}s")
+    print(f"páginas do Bing:    {result['pages']} ({result['pages_per_sec']:.2f}/s)"
+          f"{change(result['pages_per_sec'], base.get('pages_per_sec'))}")
+    print(f"resultados:         {result['results']} ({result['results_per_sec']:.2f}/s)"
+          f"{change(result['results_per_sec'], base.get('results_per_sec'))}")
+    print(f"pico de RSS:        {result['peak_rss_mb']:.1f} MB"
+          f"{change(result['peak_rss_mb'], base.get('peak_rss_mb'), lower_is_better=True)}")
+    print()
+    print(f"{'estágio':<14} {'chamadas':>9} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for stage, stats in result["stages"].items():
+        previous = base.get("stages", {}).get(stage, {})
+        print(f"{stage:<14} {stats['count']:>9} {ms(stats['p50']):>10} {ms(stats['p99']):>10}"
+              f"{change(stats['p99'], previous.get('p99'), lower_is_better=True)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--search-term", default="padaria")
+    parser.add_argument("--state", default="SP")
+    parser.add_argument("--cities", type=int, default=3, help="nº de cidades do estado na busca")
+    parser.add_argument("--pages", type=int, default=5, help="máximo de páginas por cidade e site")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="latência média das páginas de detalhe (s)")
+    parser.add_argument("--serp-latency", type=float)
+    parser.add_argument("--api-latency", type=float)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--pages-per-query", type=int, default=5,
+                        help="páginas com resultados por consulta; as seguintes vêm vazias")
+    parser.add_argument("--detail-hosts", type=int, default=6)
+    parser.add_argument("--rate-limits", action="store_true", help="mantém os limites por host do config.py")
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--save", help="grava o resultado neste arquivo JSON")
+    parser.add_argument("--baseline", help="compara com um resultado gravado antes com --save")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    server = start_standin(args)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            configure(args, workdir)
+            result = run_search(args)
+    finally:
+        server.terminate()
+        server.wait()
+
+    report(result, baseline)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
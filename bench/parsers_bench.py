@@ -0,0 +1,51 @@
+"""Compara os backends de parsing nas páginas salvas em bench/fixtures.
+
+Uso (a partir da raiz do projeto):
+
+    python -m bench.parsers_bench [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import extractor  # noqa: E402
+import parsers  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def timeit(func, html, repeat):
+    func(html)  # aquecimento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(html)
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    serp_html = load_fixture("bing_serp.html")
+    detail_html = load_fixture("cnpj_biz.html")
+
+    print(f"{'backend':<12} {'SERP (ms)':>10} {'detalhe (ms)':>13} {'resultados':>11}  CNPJ / cidade")
+    for backend in parsers.available_backends():
+        serp_ms, (items, _) = timeit(backend.serp, serp_html, args.repeat)
+        page_ms, (text, links) = timeit(backend.page, detail_html, args.repeat)
+        details = extractor.extract_from_text(text, links, "SP")
+        print(f"{backend.name:<12} {serp_ms:>10.2f} {page_ms:>13.2f} {len(items):>11}  "
+              f"{details['CNPJ']} / {details['Localização']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Servidor local que imita o Bing, as páginas de detalhe e a API de CNPJ a partir de bench/fixtures.
+
+Uso (a partir da raiz do projeto):
+
+    python -m bench.standin [--port 8765] [--latency 0.05] [--error-rate 0.0] [--pages-per-query 5]
+
+Para que cada origem tenha seus próprios limites no Transport, o servidor atende em vários
+endereços de loopback: 127.0.0.1 faz o papel do Bing, 127.0.0.2 o da BrasilAPI e 127.0.0.3 em
+diante o dos sites de destino, um por site prioritário (`--detail-hosts`). Onde só 127.0.0.1
+existe (ex.: macOS), use `--detail-hosts 0` para servir tudo num endereço só.
+
+Rotas:
+    /search?q=...&first=N     SERP com 10 resultados apontando para /detail/<cnpj>; consultas
+                              passam a vir vazias depois de `--pages-per-query` páginas
+    /detail/<cnpj>            página de detalhe (cnpj_biz.html) com o CNPJ pedido
+    /api/cnpj/v1/<cnpj>       resposta da BrasilAPI (cnpj_api.json)
+
+Cada rota espera a latência configurada (±50%) e responde 429 ou 503 com a taxa de erro configurada.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import zlib
+
+from aiohttp import web
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+RESULT_LINK = re.compile(r"https://cnpj\.biz/(\d{14})")
+FIXTURE_CNPJ = "12.345.678/0001-90"
+EMPTY_SERP = '<html><body><ol id="b_results"></ol></body></html>'
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def format_cnpj(digits):
+    return f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}"
+
+
+class StandIn:
+    def __init__(self, latency=0.05, serp_latency=None, api_latency=None, error_rate=0.0, pages_per_query=5,
+                 detail_hosts=6):
+        self.latency = {"serp": latency if serp_latency is None else serp_latency,
+                        "detail": latency,
+                        "api": latency if api_latency is None else api_latency}
+        self.error_rate = error_rate
+        self.pages_per_query = pages_per_query
+        self.detail_hosts = detail_hosts
+        self.serp_html = load_fixture("bing_serp.html")
+        self.detail_html = load_fixture("cnpj_biz.html")
+        self.api_json = json.loads(load_fixture("cnpj_api.json"))
+
+    async def delay(self, route):
+        latency = self.latency[route]
+        if latency > 0:
+            await asyncio.sleep(latency * random.uniform(0.5, 1.5))
+        if self.error_rate and random.random() < self.error_rate:
+            raise web.HTTPTooManyRequests() if random.random() < 0.5 else web.HTTPServiceUnavailable()
+
+    async def search(self, request):
+        await self.delay("serp")
+        query = request.query.get("q", "")
+        first = int(request.query.get("first", 1))
+        if first > self.pages_per_query * 10:
+            return web.Response(text=EMPTY_SERP, content_type="text/html")
+
+        # Cada (consulta, página) gera CNPJs próprios, para que todo resultado seja um lead novo
+        base = zlib.crc32(f"{query}|{first}".encode("utf-8")) % 10 ** 8
+        host = request.host
+        if self.detail_hosts:
+            # O mesmo site prioritário sempre cai no mesmo endereço
+            site = query.rpartition("site:")[2]
+            host = f"127.0.0.{3 + zlib.crc32(site.encode('utf-8')) % self.detail_hosts}:{request.url.port}"
+        mapping = {}
+
+        def local_link(match):
+            digits = mapping.setdefault(match.group(1), f"{base:08d}{len(mapping) + 1:04d}00")
+            return f"http://{host}/detail/{digits}"
+
+        return web.Response(text=RESULT_LINK.sub(local_link, self.serp_html), content_type="text/html")
+
+    async def detail(self, request):
+        await self.delay("detail")
+        digits = request.match_info["cnpj"]
+        return web.Response(text=self.detail_html.replace(FIXTURE_CNPJ, format_cnpj(digits)), content_type="text/html")
+
+    async def cnpj(self, request):
+        await self.delay("api")
+        return web.json_response(dict(self.api_json, cnpj=request.match_info["cnpj"]))
+
+    def application(self):
+        app = web.Application()
+        app.router.add_get("/search", self.search)
+        app.router.add_get("/detail/{cnpj}", self.detail)
+        app.router.add_get("/api/cnpj/v1/{cnpj}", self.cnpj)
+        return app
+
+
+def bind_hosts(detail_hosts):
+    if not detail_hosts:
+        return ["127.0.0.1"]
+    return ["127.0.0.1", "127.0.0.2"] + [f"127.0.0.{3 + i}" for i in range(detail_hosts)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="latência média das páginas de detalhe (s)")
+    parser.add_argument("--serp-latency", type=float, help="latência média da SERP (s); padrão: --latency")
+    parser.add_argument("--api-latency", type=float, help="latência média da API de CNPJ (s); padrão: --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração das respostas com 429/503")
+    parser.add_argument("--pages-per-query", type=int, default=5)
+    parser.add_argument("--detail-hosts", type=int, default=6)
+    args = parser.parse_args()
+
+    standin = StandIn(args.latency, args.serp_latency, args.api_latency, args.error_rate, args.pages_per_query,
+                      args.detail_hosts)
+    web.run_app(standin.application(), host=bind_hosts(args.detail_hosts), port=args.port,
+                print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
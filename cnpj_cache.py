@@ -0,0 +1,172 @@
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import config
+
+MISS = object()
+
+
+def normalize_cnpj(cnpj):
+    """Retorna o CNPJ só com os 14 dígitos, ou None se não for um CNPJ válido."""
+    digits = re.sub(r'[^0-9]', '', cnpj or '')
+    return digits if len(digits) == 14 else None
+
+
+class CnpjCache:
+    """Cache em disco (SQLite) das consultas de CNPJ, com uma camada LRU em memória na frente.
+
+    Uma entrada com detalhes None registra que o CNPJ não existe na API (cache negativo)
+    e expira depois de `negative_ttl`; as demais expiram depois de `ttl`.
+    """
+
+    def __init__(self, path=config.CNPJ_CACHE_PATH, ttl=config.CNPJ_CACHE_TTL,
+                 negative_ttl=config.CNPJ_NEGATIVE_TTL, memory_size=config.CNPJ_CACHE_MEMORY):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory_size = memory_size
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS cnpj_cache (cnpj TEXT PRIMARY KEY, details TEXT, fetched_at REAL NOT NULL)")
+        self.db.commit()
+
+    def _expired(self, details, fetched_at, now):
+        return now - fetched_at > (self.ttl if details is not None else self.negative_ttl)
+
+    def _remember(self, cnpj, details, fetched_at):
+        self.memory[cnpj] = (details, fetched_at)
+        self.memory.move_to_end(cnpj)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def get_many(self, cnpjs):
+        """Busca vários CNPJs normalizados de uma vez; os ausentes ou expirados ficam de fora."""
+        now = time.time()
+        found = {}
+        with self.lock:
+            missing = []
+            for cnpj in cnpjs:
+                entry = self.memory.get(cnpj)
+                if entry and not self._expired(*entry, now):
+                    self.memory.move_to_end(cnpj)
+                    found[cnpj] = entry[0]
+                else:
+                    missing.append(cnpj)
+            if missing:
+                placeholders = ",".join("?" * len(missing))
+                rows = self.db.execute(
+                    f"SELECT cnpj, details, fetched_at FROM cnpj_cache WHERE cnpj IN ({placeholders})", missing)
+                for cnpj, details, fetched_at in rows:
+                    details = json.loads(details) if details is not None else None
+                    if not self._expired(details, fetched_at, now):
+                        self._remember(cnpj, details, fetched_at)
+                        found[cnpj] = details
+        return found
+
+    def get(self, cnpj):
+        return self.get_many([cnpj]).get(cnpj, MISS)
+
+    def remember(self, cnpj, details):
+        """Guarda só na memória; o disco fica para o próximo `put_many`."""
+        with self.lock:
+            self._remember(cnpj, details, time.time())
+
+    def put_many(self, entries):
+        """Grava {cnpj: detalhes} numa única transação."""
+        if not entries:
+            return
+        now = time.time()
+        with self.lock:
+            for cnpj, details in entries.items():
+                self._remember(cnpj, details, now)
+            self.db.executemany(
+                "INSERT OR REPLACE INTO cnpj_cache (cnpj, details, fetched_at) VALUES (?, ?, ?)",
+                [(cnpj, json.dumps(details, ensure_ascii=False) if details is not None else None, now)
+                 for cnpj, details in entries.items()])
+            self.db.commit()
+
+    def put(self, cnpj, details):
+        self.put_many({cnpj: details})
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class CnpjEnricher:
+    """Consulta CNPJs passando pelo cache, com uma única chamada à API por CNPJ em andamento.
+
+    `fetch(cnpj)` é uma corrotina que recebe o CNPJ normalizado e retorna o dicionário de
+    detalhes, None se o CNPJ não existe, ou levanta exceção em falhas temporárias (que não
+    são guardadas no cache). As consultas de cada `enrich_many` vão para o disco numa única
+    transação, fora do event loop. Deve ser usado sempre a partir do mesmo event loop.
+    """
+
+    def __init__(self, cache, fetch):
+        self.cache = cache
+        self.fetch = fetch
+        self.inflight = {}
+        # CNPJs encontrados no cache e fora dele; `shared` conta os de fora que pegaram carona numa consulta em andamento
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    async def _lookup(self, cnpj):
+        future = self.inflight.get(cnpj)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[cnpj] = future
+        try:
+            details = await self.fetch(cnpj)
+            # Na memória já agora, para a próxima página não consultar de novo; o disco é gravado por enrich_many
+            self.cache.remember(cnpj, details)
+            future.set_result(details)
+            return details
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Evita o aviso de exceção não recuperada quando ninguém mais espera este CNPJ
+            future.exception()
+            raise
+        finally:
+            del self.inflight[cnpj]
+
+    async def enrich(self, cnpj):
+        return (await self.enrich_many([cnpj])).get(cnpj)
+
+    async def enrich_many(self, cnpjs):
+        """Retorna {cnpj: detalhes} para os CNPJs informados, no formato em que foram passados.
+
+        CNPJs inexistentes aparecem com None; os que falharam ou são inválidos ficam de fora.
+        """
+        normalized = {}
+        for cnpj in cnpjs:
+            digits = normalize_cnpj(cnpj)
+            if digits:
+                normalized.setdefault(digits, []).append(cnpj)
+
+        # SQLite fora do event loop, para não travar as requisições em andamento
+        found = await asyncio.to_thread(self.cache.get_many, list(normalized))
+        misses = [digits for digits in normalized if digits not in found]
+        self.hits += len(found)
+        self.misses += len(misses)
+        if misses:
+            lookups = await asyncio.gather(*[self._lookup(digits) for digits in misses], return_exceptions=True)
+            fetched = {digits: details for digits, details in zip(misses, lookups)
+                       if not isinstance(details, BaseException)}
+            await asyncio.to_thread(self.cache.put_many, fetched)
+            found.update(fetched)
+
+        return {cnpj: found[digits] for digits, originals in normalized.items() if digits in found
+                for cnpj in originals}
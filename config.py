@@ -0,0 +1,87 @@
+import os
+
+
+def _int(name, default):
+    return int(os.environ.get(name, default))
+
+
+# Limites de concorrência por estágio do motor de busca.
+# O nº de buscas simultâneas no Bing continua vindo do campo "Nº de Threads" do formulário.
+DETAIL_CONCURRENCY = _int("VAX_DETAIL_CONCURRENCY", 100)
+CNPJ_CONCURRENCY = _int("VAX_CNPJ_CONCURRENCY", 10)
+
+# Endereços do buscador e da API de CNPJ (trocados pelo servidor local em bench/engine_bench.py)
+SEARCH_URL = os.environ.get("VAX_SEARCH_URL", "https://www.bing.com/search")
+CNPJ_API_URL = os.environ.get("VAX_CNPJ_API_URL", "https://brasilapi.com.br/api/cnpj/v1")
+
+# Timeout (em segundos) de cada requisição HTTP
+REQUEST_TIMEOUT = _int("VAX_REQUEST_TIMEOUT", 10)
+
+# Transporte HTTP: conexões por sessão (uma por host), nº de sessões mantidas abertas, limite de
+# conexões simultâneas por host, tempo que uma conexão ociosa fica aberta e política de novas
+# tentativas em 429/5xx
+POOL_SIZE = _int("VAX_POOL_SIZE", 100)
+MAX_SESSIONS = _int("VAX_MAX_SESSIONS", 64)
+PER_HOST_LIMIT = _int("VAX_PER_HOST_LIMIT", 16)
+KEEPALIVE_TIMEOUT = _int("VAX_KEEPALIVE_TIMEOUT", 30)
+MAX_RETRIES = _int("VAX_MAX_RETRIES", 3)
+RETRY_BACKOFF = float(os.environ.get("VAX_RETRY_BACKOFF", 0.5))
+# Maior Retry-After (em segundos) respeitado; acima disso a resposta volta sem nova tentativa e o host
+# fica bloqueado só por esse tempo
+MAX_RETRY_AFTER = _int("VAX_MAX_RETRY_AFTER", 60)
+
+# Ritmo máximo por host (token bucket), em requisições por segundo, e tamanho da rajada permitida.
+# Bing e BrasilAPI têm orçamento próprio; cada site de destino recebe o padrão. 0 desativa o limite.
+RATE_LIMIT_BING = float(os.environ.get("VAX_RATE_LIMIT_BING", 3))
+RATE_LIMIT_CNPJ_API = float(os.environ.get("VAX_RATE_LIMIT_CNPJ_API", 3))
+RATE_LIMIT_DEFAULT = float(os.environ.get("VAX_RATE_LIMIT_DEFAULT", 10))
+RATE_BURST = _int("VAX_RATE_BURST", 10)
+
+# Concorrência adaptativa (AIMD) por host: começa em AIMD_INITIAL requisições simultâneas, sobe enquanto
+# as respostas chegam em menos de AIMD_LATENCY_TARGET segundos e cai pela metade em 429/503 ou timeout,
+# sem passar de PER_HOST_LIMIT nem descer abaixo de AIMD_MIN
+AIMD_INITIAL = _int("VAX_AIMD_INITIAL", 4)
+AIMD_MIN = _int("VAX_AIMD_MIN", 1)
+AIMD_LATENCY_TARGET = float(os.environ.get("VAX_AIMD_LATENCY_TARGET", 3))
+
+# Cache de enriquecimento de CNPJ (BrasilAPI): arquivo SQLite, validade das consultas bem-sucedidas,
+# validade dos CNPJs não encontrados (404) e nº de entradas mantidas em memória
+CNPJ_CACHE_PATH = os.environ.get("VAX_CNPJ_CACHE_PATH", "cnpj_cache.sqlite3")
+CNPJ_CACHE_TTL = _int("VAX_CNPJ_CACHE_TTL", 30 * 24 * 3600)
+CNPJ_NEGATIVE_TTL = _int("VAX_CNPJ_NEGATIVE_TTL", 24 * 3600)
+CNPJ_CACHE_MEMORY = _int("VAX_CNPJ_CACHE_MEMORY", 10000)
+
+# Parser de HTML: "auto" (o mais rápido instalado), "selectolax", "lxml" ou "html.parser"
+PARSER_BACKEND = os.environ.get("VAX_PARSER_BACKEND", "auto")
+
+# Logs: nível mínimo ("debug" inclui as linhas por URL), nº de linhas mantidas para a interface
+# e arquivo JSONL rotativo (vazio desativa o arquivo)
+LOG_LEVEL = os.environ.get("VAX_LOG_LEVEL", "info")
+LOG_BUFFER_SIZE = _int("VAX_LOG_BUFFER_SIZE", 2000)
+LOG_FILE = os.environ.get("VAX_LOG_FILE", "vaxbuscas.log.jsonl")
+LOG_FILE_MAX_BYTES = _int("VAX_LOG_FILE_MAX_BYTES", 10 * 1024 * 1024)
+LOG_FILE_BACKUPS = _int("VAX_LOG_FILE_BACKUPS", 5)
+
+# Buscas simultâneas por processo e quantas buscas encerradas ficam disponíveis para consulta
+MAX_RUNNING_JOBS = _int("VAX_MAX_RUNNING_JOBS", 5)
+MAX_FINISHED_JOBS = _int("VAX_MAX_FINISHED_JOBS", 20)
+
+# Proxies: teste paralelo (URL, timeout e nº de testes simultâneos) e punição de proxies que
+# falham durante a busca (falhas seguidas até a pausa, pausa inicial em segundos e nº de pausas
+# até o descarte)
+PROXY_CHECK_URL = os.environ.get("VAX_PROXY_CHECK_URL", "https://www.google.com")
+PROXY_CHECK_TIMEOUT = _int("VAX_PROXY_CHECK_TIMEOUT", 5)
+PROXY_CHECK_CONCURRENCY = _int("VAX_PROXY_CHECK_CONCURRENCY", 50)
+PROXY_MAX_FAILURES = _int("VAX_PROXY_MAX_FAILURES", 3)
+PROXY_COOLDOWN = _int("VAX_PROXY_COOLDOWN", 30)
+PROXY_MAX_STRIKES = _int("VAX_PROXY_MAX_STRIKES", 3)
+
+# Fronteira da busca: arquivo SQLite com o progresso das buscas e as URLs já visitadas,
+# e idade (em segundos) a partir da qual uma página de detalhe pode ser visitada de novo (0 desativa)
+FRONTIER_PATH = os.environ.get("VAX_FRONTIER_PATH", "frontier.sqlite3")
+RECRAWL_AGE = _int("VAX_RECRAWL_AGE", 7 * 24 * 3600)
+
+# Stream /events (Server-Sent Events) na interface. Cada aba aberta prende uma thread do servidor enquanto
+# acompanha a busca, então só vale ligar com workers em threads (o gunicorn.conf.py do projeto já liga);
+# desligado, a interface consulta /get_results e /dashboard periodicamente
+EVENT_STREAM = bool(_int("VAX_EVENT_STREAM", 0))
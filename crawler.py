@@ -0,0 +1,424 @@
+"""Motor de busca: event loop próprio, transporte HTTP, enriquecimento de CNPJ e o CrawlEngine.
+
+Carregado sob demanda pelas rotas (na primeira busca ou teste de proxies), junto com as
+dependências pesadas (aiohttp, backends de parsing, índice de cidades do extrator).
+"""
+import asyncio
+import threading
+import time
+
+import aiohttp
+
+import config
+import extractor
+import metrics
+import parsers
+from cnpj_cache import CnpjCache, CnpjEnricher
+from planner import QueryPlan
+from shared import proxy_pool, saved_cnpjs, add_result, get_frontier, log_message, log_enabled
+from transport import Transport
+
+# Event loop do motor de busca (iniciado sob demanda em uma thread própria)
+crawl_loop = None
+crawl_loop_lock = threading.Lock()
+transport = None
+cnpj_enricher = None
+cnpj_semaphore = None
+
+# Sites prioritários
+priority_sites = [
+    "cnpj.biz",
+    "econodata.com.br",
+    "casadosdados.com.br",
+    "informecadastral.com.br",
+    "diariocidade.com.br",
+    "consultas.plus"
+]
+
+def get_search_url(search_term, city, state, priority_site, page):
+    first = (page - 1) * 10 + 1
+    url = f"{config.SEARCH_URL}?q={search_term.replace(' ', '+')}+in+{city.replace(' ', '+')},+{state}+site:{priority_site}&first={first}"
+    if log_enabled("debug"):
+        log_message(f"URL gerada: {url}", "debug")
+    return url
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
+}
+
+# Respostas que indicam que o proxy foi bloqueado ou recusou a conexão
+PROXY_BLOCK_STATUSES = {403, 407, 429}
+
+def request_outcome(status):
+    return "ok" if status < 400 else f"http_{status}"
+
+EMPTY_CNPJ_DETAILS = {"Situação Cadastral": "N/A", "Nome dos Sócios": "N/A", "Data de Abertura": "N/A", "Inscrição Estadual": "N/A"}
+
+def get_crawl_loop():
+    """Retorna o event loop do motor de busca, iniciando-o na primeira chamada."""
+    global crawl_loop
+    with crawl_loop_lock:
+        if crawl_loop is None:
+            crawl_loop = asyncio.new_event_loop()
+            threading.Thread(target=crawl_loop.run_forever, name="crawl-loop", daemon=True).start()
+    return crawl_loop
+
+def get_transport():
+    """Transporte HTTP compartilhado pelas buscas; deve ser chamado de dentro do crawl loop."""
+    global transport
+    if transport is None:
+        transport = Transport(headers=HEADERS)
+    return transport
+
+def get_cnpj_enricher():
+    """Enriquecimento de CNPJ com cache persistente; deve ser chamado de dentro do crawl loop."""
+    global cnpj_enricher, cnpj_semaphore
+    if cnpj_enricher is None:
+        cnpj_semaphore = asyncio.Semaphore(config.CNPJ_CONCURRENCY)
+        cnpj_enricher = CnpjEnricher(CnpjCache(), fetch_cnpj_details)
+    return cnpj_enricher
+
+async def check_proxy(proxy):
+    start = time.perf_counter()
+    response = await get_transport().get(config.PROXY_CHECK_URL, proxy=proxy, retries=0, throttled=False,
+                                         timeout=aiohttp.ClientTimeout(total=config.PROXY_CHECK_TIMEOUT))
+    if response.status != 200:
+        raise ValueError(f"retornou status {response.status}")
+    return time.perf_counter() - start
+
+def log_proxy_check(proxy, error):
+    if error is None:
+        log_message(f"Proxy {proxy} válido.")
+    else:
+        log_message(f"Erro no proxy {proxy}: {str(error)}", "error")
+
+async def run_proxy_check(check):
+    try:
+        await check.run(on_result=log_proxy_check)
+    except Exception as e:
+        log_message(f"Erro inesperado no teste de proxies: {str(e)}", "error")
+    log_message(f"Teste concluído. {check.valid} proxies válidos.")
+
+def start_search(job):
+    """Agenda a busca no event loop do motor e retorna o Future correspondente."""
+    return asyncio.run_coroutine_threadsafe(manage_search(job), get_crawl_loop())
+
+def start_proxy_check(check):
+    return asyncio.run_coroutine_threadsafe(run_proxy_check(check), get_crawl_loop())
+
+async def fetch_cnpj_details(cnpj):
+    """Consulta um CNPJ (só dígitos) na BrasilAPI. Retorna None se o CNPJ não existe."""
+    url = f"{config.CNPJ_API_URL}/{cnpj}"
+    try:
+        metrics.queue_depth.inc(queue="cnpj")
+        try:
+            await cnpj_semaphore.acquire()
+        finally:
+            metrics.queue_depth.dec(queue="cnpj")
+        start = time.perf_counter()
+        try:
+            response = await get_transport().get(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            metrics.requests_total.inc(stage="cnpj_api", outcome="error")
+            raise
+        finally:
+            cnpj_semaphore.release()
+            metrics.stage_seconds.observe(time.perf_counter() - start, stage="cnpj_api")
+        metrics.bytes_total.inc(len(response.content), stage="cnpj_api")
+        metrics.requests_total.inc(stage="cnpj_api", outcome=request_outcome(response.status))
+        if response.status == 404:
+            log_message(f"CNPJ {cnpj} não encontrado na API.", "warning")
+            return None
+        response.raise_for_status()
+        data = response.json()
+    except Exception as e:
+        log_message(f"Erro ao consultar CNPJ {cnpj}: {str(e)}", "error")
+        raise
+    socios = ", ".join([socio["nome"] for socio in data.get("qsa", [])]) if data.get("qsa") else "N/A"
+    return {
+        "Situação Cadastral": data.get("situacao_cadastral", "N/A"),
+        "Nome dos Sócios": socios,
+        "Data de Abertura": data.get("data_inicio_atividade", "N/A"),
+        "Inscrição Estadual": data.get("inscricao_estadual", "N/A")
+    }
+
+class CrawlEngine:
+    """Pipeline assíncrono de uma busca: páginas do Bing -> páginas de detalhe -> API de CNPJ.
+
+    Cada estágio tem seu próprio limite de concorrência, então uma busca mantém
+    centenas de requisições em andamento sem precisar de uma thread por requisição.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.state = job.state
+        self.transport = None
+        self.pending = set()
+        self.frontier = None
+        # URLs de detalhe já reservadas por alguma página desta busca e as que não chegaram a ser processadas
+        self.claimed = set()
+        self.failed_urls = set()
+
+    async def run(self):
+        job = self.job
+        self.detail_semaphore = asyncio.Semaphore(config.DETAIL_CONCURRENCY)
+        params = {"search_term": job.search_term, "cities": job.cities, "state": job.state,
+                  "max_pages": job.max_pages, "num_threads": job.num_threads}
+        # As chamadas à fronteira (SQLite, com commit em disco) rodam fora do event loop, que é compartilhado
+        # por todas as buscas: cada fsync no loop atrasaria todas as requisições em andamento
+        self.frontier = await asyncio.to_thread(get_frontier)
+        done_pages, restored = await asyncio.to_thread(self.frontier.start, job.key, params, job.resume)
+        for result_data in restored:
+            job.claim_cnpj(result_data["CNPJ"])
+            add_result(job, result_data, restored=True)
+        if done_pages or restored:
+            log_message(f"Busca {job.id} retomada: {len(done_pages)} páginas já concluídas, {len(restored)} resultados recuperados.")
+
+        # Uma consulta por (cidade × site prioritário × página), dos ramos que mais rendem para os que menos rendem
+        priors = await asyncio.to_thread(self.frontier.site_priors)
+        self.plan = job.plan = QueryPlan(job.cities, priority_sites, job.max_pages, priors, done=done_pages)
+
+        self.transport = get_transport()
+        # Cada worker busca uma página do Bing por vez; o nº de workers limita o estágio de SERP
+        workers = [asyncio.create_task(self.worker(f"Worker-{i+1}"))
+                   for i in range(min(job.num_threads, len(self.plan.branches)))]
+        try:
+            await asyncio.gather(*workers)
+            while self.pending:
+                # Erros das páginas já vão para o log em page_done; aqui só se espera todas terminarem
+                await asyncio.gather(*list(self.pending), return_exceptions=True)
+        except BaseException:
+            # Nada desta busca pode continuar rodando depois do job.finish() em manage_search
+            await self.cancel(workers)
+            raise
+        if not job.stopped:
+            await asyncio.to_thread(self.frontier.finish, job.key)
+        stopped_early = sum(branch["stopped_early"] for branch in self.plan.summary())
+        if stopped_early:
+            log_message(f"Busca {job.id}: {stopped_early} combinações de cidade e site encerradas antes da última página por não trazerem CNPJs novos.")
+
+    async def cancel(self, workers):
+        tasks = [task for task in workers + list(self.pending) if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def observe(self, stage, start):
+        """Registra a duração de um estágio no /metrics e no resumo de tempos da busca."""
+        elapsed = time.perf_counter() - start
+        metrics.stage_seconds.observe(elapsed, stage=stage)
+        self.job.record_timing(stage, elapsed)
+
+    async def fetch(self, url, stage):
+        # Cada requisição sorteia um proxy pela nota; o resultado volta para a nota do proxy
+        proxy = proxy_pool.choose()
+        start = time.perf_counter()
+        metrics.in_flight.inc(stage=stage)
+        try:
+            response = await self.transport.get(url, proxy=proxy)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            metrics.requests_total.inc(stage=stage, outcome="error")
+            if proxy:
+                proxy_pool.report(proxy, False)
+                metrics.proxy_failures_total.inc()
+            raise
+        finally:
+            metrics.in_flight.dec(stage=stage)
+            self.observe(stage, start)
+        metrics.requests_total.inc(stage=stage, outcome=request_outcome(response.status))
+        metrics.bytes_total.inc(len(response.content), stage=stage)
+        if proxy:
+            blocked = response.status in PROXY_BLOCK_STATUSES
+            proxy_pool.report(proxy, not blocked, time.perf_counter() - start)
+            if blocked:
+                metrics.proxy_failures_total.inc()
+        response.raise_for_status()
+        return response.text
+
+    def parse_serp(self, html):
+        start = time.perf_counter()
+        try:
+            return parsers.backend.serp(html)
+        finally:
+            self.observe("serp_parse", start)
+
+    def parse_details(self, html):
+        start = time.perf_counter()
+        text, links = extractor.parse(html)
+        self.observe("detail_parse", start)
+        start = time.perf_counter()
+        details = extractor.extract_from_text(text, links, self.state)
+        self.observe("extract", start)
+        return text, details
+
+    async def extract_details_from_page(self, url):
+        await self.job.wait_if_paused()
+        if self.job.stopped:
+            self.failed_urls.add(url)
+            return None
+        metrics.queue_depth.inc(queue="details")
+        try:
+            await self.detail_semaphore.acquire()
+        finally:
+            metrics.queue_depth.dec(queue="details")
+        try:
+            html = await self.fetch(url, "detail_fetch")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            log_message(f"Erro na requisição para {url}: {str(e)}", "error")
+            self.failed_urls.add(url)
+            return None
+        finally:
+            self.detail_semaphore.release()
+        # Parsing e extração são CPU-bound: rodam fora do event loop para não travar as requisições em andamento
+        text, details = await asyncio.to_thread(self.parse_details, html)
+        if log_enabled("debug"):
+            log_message(f"Conteúdo HTML recebido para {url}", "debug")
+            log_message(f"Texto extraído (primeiros 200 caracteres): {text[:200]}...", "debug")
+        return details
+
+    async def process_result(self, title, url, details, visited):
+        """`details` vem da fronteira quando a URL já foi visitada; senão a página é buscada agora e entra em `visited`."""
+        if details is None:
+            try:
+                details = await self.extract_details_from_page(url)
+            except Exception as e:
+                # Um resultado com problema não derruba os outros da mesma página; a URL fica para a retomada
+                log_message(f"Erro ao extrair dados de {url}: {str(e)}", "error")
+                self.failed_urls.add(url)
+                return None
+            if details is None:
+                return None
+            visited[url] = details
+        if self.state and details["Localização"] == "N/A":
+            log_message(f"Localização de {url} não corresponde ao estado {self.state}. Ignorando.", "warning")
+            return None
+        if details["CNPJ"] != "N/A" and details["CNPJ"] not in saved_cnpjs:
+            result_data = {"Título": title, "URL": url}
+            result_data.update(details)
+            return result_data
+        return None
+
+    async def process_page(self, unit, items):
+        page_done, new_cnpjs = False, None
+        try:
+            page_done, new_cnpjs = await self.process_items(unit, items)
+        finally:
+            # Sempre devolve a unidade ao plano, senão a próxima página do ramo nunca é liberada
+            self.plan.report(unit, new_cnpjs, failed=not page_done)
+
+    async def process_items(self, unit, items):
+        """Processa os resultados de uma página do Bing e retorna (página concluída, CNPJs novos).
+
+        CNPJs novos é None quando a página não trouxe nenhum e também não buscou nenhuma URL: todas
+        já tinham sido pegas por outra página ou visitadas antes, e o zero não diz nada sobre o ramo.
+        """
+        # URLs que outra página desta busca já pegou ficam de fora. As visitadas dentro do RECRAWL_AGE não são
+        # buscadas de novo: os detalhes guardados delas na fronteira voltam para esta busca
+        fresh = [(title, url) for title, url in items if url not in self.claimed]
+        self.claimed.update(url for _, url in fresh)
+        known = await asyncio.to_thread(self.frontier.visited, {url for _, url in fresh}, self.state)
+        if known and log_enabled("debug"):
+            log_message(f"{unit}: {len(known)} URLs já visitadas foram reaproveitadas da fronteira.", "debug")
+
+        visited = {}
+        found = await asyncio.gather(*[self.process_result(title, url, known.get(url), visited) for title, url in fresh])
+        # O mesmo CNPJ aparece em várias cidades e sites; só o primeiro conta como lead novo
+        found = [result_data for result_data in found if result_data and self.job.claim_cnpj(result_data["CNPJ"])]
+        if found:
+            # Uma única consulta ao cache/API de CNPJ por página do Bing
+            start = time.perf_counter()
+            enriched = await get_cnpj_enricher().enrich_many({result_data["CNPJ"] for result_data in found})
+            self.observe("cnpj_enrich", start)
+            for result_data in found:
+                result_data.update(enriched.get(result_data["CNPJ"]) or EMPTY_CNPJ_DETAILS)
+                add_result(self.job, result_data)
+                log_message(f"Encontrado: {result_data['Título']} - {result_data['URL']} (CNPJ: {result_data['CNPJ']})")
+
+        # A página só conta como concluída se nenhuma URL dela ficou para trás (erro ou /stop_search);
+        # ao retomar, ela é buscada de novo e só as URLs que faltaram são visitadas
+        page_done = not any(url in self.failed_urls for _, url in fresh)
+        new_cnpjs = len(found) if found or visited else None
+        await asyncio.to_thread(self.frontier.checkpoint, self.job.key, unit.key, self.state, visited, found,
+                                page_done, new_cnpjs)
+        if page_done and new_cnpjs is not None:
+            await asyncio.to_thread(self.frontier.record_yield, unit.branch.site, new_cnpjs)
+        elif page_done and log_enabled("debug"):
+            log_message(f"{unit}: só URLs já visitadas e nenhum CNPJ novo; o ramo continua na próxima página.", "debug")
+        return page_done, new_cnpjs
+
+    async def worker(self, name):
+        job = self.job
+        while not job.stopped:
+            await job.wait_if_paused()
+            unit = await self.plan.next()
+            if unit is None:
+                break
+            if not job.running or job.stopped:
+                self.plan.report(unit, None, failed=True)
+                break
+
+            url = get_search_url(job.search_term, unit.branch.city, job.state, unit.branch.site, unit.page)
+            if log_enabled("debug"):
+                log_message(f"{name} buscando {unit} com URL: {url}", "debug")
+
+            try:
+                html = await self.fetch(url, "serp_fetch")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                log_message(f"Erro na requisição para {unit}: {str(e)}", "error")
+                self.plan.report(unit, None, failed=True)
+                continue
+            try:
+                # Tentar múltiplos seletores para resultados do Bing
+                search_results, snippet = await asyncio.to_thread(self.parse_serp, html)
+                if log_enabled("debug"):
+                    log_message(f"Conteúdo HTML recebido para {unit}", "debug")
+                if not search_results:
+                    log_message(f"Nenhum resultado em {unit}. Verifique seletores ou HTML.", "warning")
+                    if log_enabled("debug"):
+                        log_message(f"HTML snippet: {snippet}...", "debug")
+                    await asyncio.to_thread(self.frontier.checkpoint, job.key, unit.key, job.state, {}, [], True, 0)
+                    await asyncio.to_thread(self.frontier.record_yield, unit.branch.site, 0)
+                    self.plan.report(unit, 0)
+                    continue
+            except Exception as e:
+                # Uma página com problema não derruba o worker; ela fica para a retomada
+                log_message(f"Erro ao processar a página de resultados de {unit}: {str(e)}", "error")
+                self.plan.report(unit, None, failed=True)
+                continue
+
+            # Os resultados seguem para o estágio de detalhe sem bloquear a próxima página do Bing
+            items = [(title, result_url) for title, result_url in search_results if result_url != "N/A"]
+            task = asyncio.create_task(self.process_page(unit, items))
+            self.pending.add(task)
+            metrics.queue_depth.inc(queue="pages")
+            task.add_done_callback(self.page_done)
+
+    def page_done(self, task):
+        self.pending.discard(task)
+        metrics.queue_depth.dec(queue="pages")
+        # Ninguém mais aguarda a tarefa depois que ela sai de `pending`; o erro precisa chegar ao log daqui
+        if not task.cancelled() and task.exception() is not None:
+            log_message(f"Erro ao processar uma página da busca {self.job.id}: {str(task.exception())}", "error")
+
+async def manage_search(job):
+    engine = CrawlEngine(job)
+    try:
+        await engine.run()
+    except Exception as e:
+        log_message(f"Erro inesperado na busca {job.id}: {str(e)}", "error")
+
+    job.finish()
+    log_message(f"Busca {job.id} concluída. Total de resultados: {len(job.results)}")
+
+# Métricas que já existem em outros objetos, lidas só na hora da coleta do /metrics
+metrics.registry.callback(
+    "vaxbuscas_cnpj_lookups_total",
+    "CNPJs consultados, por origem (hit: cache, miss: fora do cache, shared: miss que aproveitou consulta em andamento).",
+    lambda: {("hit",): cnpj_enricher.hits, ("miss",): cnpj_enricher.misses, ("shared",): cnpj_enricher.shared}
+    if cnpj_enricher else {}, kind="counter", labels=["result"])
+metrics.registry.callback(
+    "vaxbuscas_host_concurrency", "Limite atual de requisições simultâneas por host (AIMD).",
+    lambda: {(throttle["host"],): throttle["concurrency"] for throttle in transport.throttle_summary()}
+    if transport else {}, labels=["host"])
@@ -0,0 +1,58 @@
+import json
+import queue
+import threading
+
+
+class EventBroker:
+    """Distribui eventos para os clientes conectados ao /events (Server-Sent Events).
+
+    Um cliente pode se inscrever só nos eventos de um job (`job`); eventos publicados sem job
+    (logs) vão para todos. Cada cliente tem uma fila limitada; se ele não consome a tempo, os eventos mais antigos
+    são descartados e o cliente recupera o que perdeu pelos cursores do /get_results.
+    """
+
+    def __init__(self, max_queue=1000):
+        self.max_queue = max_queue
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, job=None):
+        subscriber = queue.Queue(maxsize=self.max_queue)
+        with self.lock:
+            self.subscribers[subscriber] = job
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.pop(subscriber, None)
+
+    def publish(self, event, data, job=None):
+        message = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        with self.lock:
+            subscribers = [subscriber for subscriber, only_job in self.subscribers.items()
+                           if job is None or only_job is None or only_job == job]
+        for subscriber in subscribers:
+            while True:
+                try:
+                    subscriber.put_nowait(message)
+                    break
+                except queue.Full:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def stream(self, initial=(), job=None, heartbeat=15):
+        """Gerador com as mensagens SSE de um cliente, até ele desconectar."""
+        subscriber = self.subscribe(job)
+        try:
+            for event, data in initial:
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            while True:
+                try:
+                    yield subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    # Comentário SSE: mantém a conexão viva através de proxies
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscriber)
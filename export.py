@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+
+# Formato -> (mimetype, extensão do arquivo)
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+CSV_CHUNK_SIZE = 64 * 1024
+PARQUET_ROW_GROUP = 1000
+
+
+def unique_rows(results, fields, on_cnpj=None):
+    """Projeta os resultados nos campos pedidos, descartando CNPJs repetidos à medida que passa.
+
+    `on_cnpj` é chamado para cada CNPJ exportado (ex.: marcar como já salvo).
+    """
+    seen = set()
+    for result in results:
+        cnpj = result.get("CNPJ")
+        if cnpj is not None:
+            if cnpj in seen:
+                continue
+            seen.add(cnpj)
+            if on_cnpj and cnpj != "N/A":
+                on_cnpj(cnpj)
+        yield [result.get(field, "") for field in fields]
+
+
+def csv_stream(rows, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    # O cabeçalho sai na hora; depois, as linhas vão em blocos de até CSV_CHUNK_SIZE caracteres
+    writer.writerow(fields)
+    yield buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CSV_CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def jsonl_stream(rows, fields):
+    for row in rows:
+        yield (json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class _ParquetSink:
+    """Arquivo em memória que só guarda os bytes ainda não enviados ao cliente."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def parquet_stream(rows, fields):
+    """Gera um Parquet em row groups de PARQUET_ROW_GROUP linhas, enviando cada um assim que fica pronto."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(field, pa.string()) for field in fields])
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    def write(batch):
+        columns = [[None if row[i] is None else str(row[i]) for row in batch] for i in range(len(fields))]
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= PARQUET_ROW_GROUP:
+            write(batch)
+            batch = []
+            yield sink.drain()
+    if batch:
+        write(batch)
+    writer.close()
+    yield sink.drain()
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream(fmt, results, fields, on_cnpj=None):
+    rows = unique_rows(results, fields, on_cnpj)
+    if fmt == "jsonl":
+        return jsonl_stream(rows, fields)
+    if fmt == "parquet":
+        return parquet_stream(rows, fields)
+    return csv_stream(rows, fields)
@@ -0,0 +1,136 @@
+import re
+import unicodedata
+
+import parsers
+from regions import states_cities
+
+# Todos os campos são encontrados em uma única varredura do texto. A ordem das alternativas
+# decide qual campo fica com um trecho que casa com mais de um padrão (ex.: o domínio de um
+# e-mail não é contado também como website).
+FIELDS_PATTERN = re.compile(
+    r'(?P<cnpj>\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2})'
+    r'|(?P<email>[\w\.-]+@[\w\.-]+\.\w+)'
+    r'|(?P<whatsapp>(?:https?://)?(?:wa\.me|api\.whatsapp\.com|whatsapp\.com)/[\d+]{10,15})'
+    r'|(?P<website>(?:https?://)?(?:www\.)?[\w\.-]+\.(?:com|com\.br|org|net)(?:/[\w/-]*)?)'
+    r'|(?P<phone>\(?\d{2}\)?[\s-]?\d{4,5}[\s-]?\d{4})'
+)
+# Telefones celulares (5 dígitos antes do hífen) também contam como WhatsApp
+MOBILE_PATTERN = re.compile(r'\(?\d{2}\)?[\s-]?\d{5}[\s-]?\d{4}')
+
+SOCIAL_PATTERN = re.compile(
+    r'(?P<google>google\.com/maps|g\.page)'
+    r'|(?P<linkedin>linkedin\.com)'
+    r'|(?P<instagram>instagram\.com)'
+    r'|(?P<whatsapp>whatsapp\.com|wa\.me)'
+)
+SOCIAL_FIELDS = {
+    "google": "Google Meu Negócio",
+    "linkedin": "LinkedIn",
+    "instagram": "Instagram",
+    "whatsapp": "WhatsApp",
+}
+
+
+def _build_fold_table():
+    table = {}
+    for code in range(0xC0, 0x250):
+        char = chr(code)
+        base = "".join(c for c in unicodedata.normalize("NFKD", char) if not unicodedata.combining(c))
+        if base != char:
+            table[code] = base
+    return table
+
+
+FOLD_TABLE = _build_fold_table()
+
+
+def fold(text):
+    """Remove acentos e converte para minúsculas, para comparações insensíveis a acentuação."""
+    return text.translate(FOLD_TABLE).lower()
+
+
+class CityIndex:
+    """Localiza as cidades de cada estado em um texto com uma única varredura por página.
+
+    Para cada estado é pré-compilada uma expressão com os nomes das cidades sem acento.
+    Quando várias cidades aparecem, vence a que vem primeiro na lista do estado.
+    """
+
+    def __init__(self, states_cities):
+        self.patterns = {}
+        self.ranks = {}
+        for state, cities in states_cities.items():
+            folded = [fold(city) for city in cities]
+            # Nomes mais longos primeiro, para "juazeiro do norte" não parar em "juazeiro"
+            alternatives = sorted(set(folded), key=len, reverse=True)
+            self.patterns[state] = re.compile("|".join(re.escape(name) for name in alternatives))
+            self.ranks[state] = {name: (i, city) for i, (name, city) in reversed(list(enumerate(zip(folded, cities))))}
+
+    def find(self, folded_text, state):
+        pattern = self.patterns.get(state)
+        if pattern is None:
+            return None
+        ranks = self.ranks[state]
+        best = None
+        for match in pattern.finditer(folded_text):
+            rank = ranks[match.group()]
+            if best is None or rank < best:
+                best = rank
+                if rank[0] == 0:
+                    break
+        return best[1] if best else None
+
+
+city_index = CityIndex(states_cities)
+
+
+def parse(html):
+    """Retorna o texto visível e os links (href) de uma página, com o backend configurado."""
+    return parsers.backend.page(html)
+
+
+def extract_from_text(text, links=(), state=None):
+    """Extrai os campos de contato de uma página já convertida em texto e links."""
+    found = {}
+    whatsapp = None
+    for match in FIELDS_PATTERN.finditer(text):
+        field = match.lastgroup
+        value = match.group()
+        if field == "phone" and whatsapp is None and MOBILE_PATTERN.fullmatch(value):
+            whatsapp = value
+        elif field == "whatsapp" and whatsapp is None:
+            whatsapp = value
+        if field != "whatsapp" and field not in found:
+            found[field] = value
+            if len(found) == 4 and whatsapp is not None:
+                break
+
+    details = {
+        "CNPJ": found.get("cnpj", "N/A"),
+        "Telefone": found.get("phone", "N/A"),
+        "Email": found.get("email", "N/A"),
+        "Localização": "N/A",
+        "Website": found.get("website", "N/A"),
+        "WhatsApp": whatsapp or "N/A",
+        "Google Meu Negócio": "N/A",
+        "LinkedIn": "N/A",
+        "Instagram": "N/A",
+    }
+
+    for link in links:
+        match = SOCIAL_PATTERN.search(link)
+        if match:
+            details[SOCIAL_FIELDS[match.lastgroup]] = link
+
+    if state:
+        details["Localização"] = city_index.find(fold(text), state) or "N/A"
+    return details
+
+
+def extract(html, state=None):
+    """Extrai os detalhes de uma página de empresa, sem acesso à rede.
+
+    Com `state`, a Localização é a primeira cidade do estado citada na página ("N/A" se nenhuma).
+    """
+    text, links = parse(html)
+    return extract_from_text(text, links, state)
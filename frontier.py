@@ -0,0 +1,132 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+import config
+
+
+class Frontier:
+    """Registro persistente (SQLite) do progresso das buscas.
+
+    Guarda quais páginas do Bing de cada busca já foram concluídas (identificadas pela unidade do
+    plano, "cidade|site|página"), os resultados encontrados (para retomar depois de um /stop_search
+    ou de um restart), os detalhes extraídos de cada página de detalhe visitada, reaproveitados em
+    vez de buscar a URL de novo dentro de `recrawl_age`, e o rendimento histórico de cada site prioritário.
+    """
+
+    def __init__(self, path=config.FRONTIER_PATH, recrawl_age=config.RECRAWL_AGE):
+        self.recrawl_age = recrawl_age
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS searches (
+                key TEXT PRIMARY KEY, params TEXT NOT NULL, updated_at REAL NOT NULL,
+                finished INTEGER NOT NULL DEFAULT 0);
+            CREATE TABLE IF NOT EXISTS pages (
+                search_key TEXT NOT NULL, page TEXT NOT NULL, done_at REAL NOT NULL, new_cnpjs INTEGER,
+                PRIMARY KEY (search_key, page));
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, search_key TEXT NOT NULL, data TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS results_search ON results (search_key);
+            CREATE TABLE IF NOT EXISTS visited (
+                url TEXT NOT NULL, state TEXT NOT NULL, fetched_at REAL NOT NULL, details TEXT NOT NULL,
+                PRIMARY KEY (url, state));
+            CREATE TABLE IF NOT EXISTS site_yields (
+                site TEXT PRIMARY KEY, pages INTEGER NOT NULL, new_cnpjs INTEGER NOT NULL);
+        """)
+        self.db.commit()
+
+    @staticmethod
+    def search_key(search_term, state, cities):
+        """Identifica uma busca pelos parâmetros, para que a mesma busca possa ser retomada."""
+        identity = json.dumps([search_term.strip().lower(), state, sorted(cities)], ensure_ascii=False)
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+
+    def start(self, key, params, resume):
+        """Registra o início da busca e retorna ({página concluída: CNPJs novos}, resultados já encontrados).
+
+        Sem `resume`, o checkpoint anterior da mesma busca é descartado e ela recomeça do zero.
+        """
+        with self.lock, self.db:
+            if not resume:
+                self.db.execute("DELETE FROM pages WHERE search_key = ?", (key,))
+                self.db.execute("DELETE FROM results WHERE search_key = ?", (key,))
+            self.db.execute("DELETE FROM visited WHERE fetched_at < ?", (time.time() - self.recrawl_age,))
+            self.db.execute(
+                "INSERT OR REPLACE INTO searches (key, params, updated_at, finished) VALUES (?, ?, ?, 0)",
+                (key, json.dumps(params, ensure_ascii=False), time.time()))
+            pages = dict(self.db.execute("SELECT page, new_cnpjs FROM pages WHERE search_key = ?", (key,)))
+            results = [json.loads(data) for (data,) in self.db.execute(
+                "SELECT data FROM results WHERE search_key = ? ORDER BY id", (key,))]
+        return pages, results
+
+    def visited(self, urls, state):
+        """Das URLs informadas, retorna {url: detalhes} das visitadas há menos de `recrawl_age` segundos.
+
+        Os detalhes dependem do estado da busca (a Localização é procurada entre as cidades dele),
+        então só valem para buscas no mesmo `state`.
+        """
+        if not urls or self.recrawl_age <= 0:
+            return {}
+        urls = list(urls)
+        placeholders = ",".join("?" * len(urls))
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT url, details FROM visited WHERE state = ? AND fetched_at >= ? AND url IN ({placeholders})",
+                [state or "", time.time() - self.recrawl_age] + urls).fetchall()
+        return {url: json.loads(details) for url, details in rows}
+
+    def checkpoint(self, key, page, state, visited, results, page_done=True, new_cnpjs=None):
+        """Grava, numa única transação, as URLs visitadas ({url: detalhes}), os resultados e a conclusão da página.
+
+        `new_cnpjs` é o rendimento da página, usado pelo plano ao retomar (None: a página não diz nada sobre o ramo).
+        """
+        now = time.time()
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO visited (url, state, fetched_at, details) VALUES (?, ?, ?, ?)",
+                                [(url, state or "", now, json.dumps(details, ensure_ascii=False))
+                                 for url, details in visited.items()])
+            self.db.executemany("INSERT INTO results (search_key, data) VALUES (?, ?)",
+                                [(key, json.dumps(result, ensure_ascii=False)) for result in results])
+            if page_done:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO pages (search_key, page, done_at, new_cnpjs) VALUES (?, ?, ?, ?)",
+                    (key, page, now, new_cnpjs))
+            self.db.execute("UPDATE searches SET updated_at = ? WHERE key = ?", (now, key))
+
+    def record_yield(self, site, new_cnpjs):
+        with self.lock, self.db:
+            self.db.execute("""
+                INSERT INTO site_yields (site, pages, new_cnpjs) VALUES (?, 1, ?)
+                ON CONFLICT (site) DO UPDATE SET pages = pages + 1, new_cnpjs = new_cnpjs + excluded.new_cnpjs""",
+                (site, new_cnpjs))
+
+    def site_priors(self):
+        """Média de CNPJs novos por página de cada site, em todas as buscas já feitas."""
+        with self.lock:
+            rows = self.db.execute("SELECT site, pages, new_cnpjs FROM site_yields WHERE pages > 0").fetchall()
+        return {site: new_cnpjs / pages for site, pages, new_cnpjs in rows}
+
+    def finish(self, key):
+        with self.lock, self.db:
+            self.db.execute("UPDATE searches SET finished = 1, updated_at = ? WHERE key = ?", (time.time(), key))
+
+    def get_params(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT params FROM searches WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def incomplete(self):
+        """Buscas interrompidas antes do fim, com o progresso salvo de cada uma."""
+        with self.lock:
+            rows = self.db.execute("""
+                SELECT s.key, s.params, s.updated_at,
+                       (SELECT COUNT(*) FROM pages p WHERE p.search_key = s.key),
+                       (SELECT COUNT(*) FROM results r WHERE r.search_key = s.key)
+                FROM searches s WHERE s.finished = 0 ORDER BY s.updated_at DESC""").fetchall()
+        return [{"key": key, "params": json.loads(params), "updated_at": updated_at,
+                 "pages_done": pages_done, "results": results}
+                for key, params, updated_at, pages_done, results in rows]
@@ -0,0 +1,19 @@
+"""Configuração do gunicorn (lida automaticamente quando ele é iniciado na raiz do projeto).
+
+As buscas, os proxies e os logs ficam na memória do processo, então há um único worker; as
+requisições são atendidas em threads (gthread), para que o stream /events de cada aba aberta
+não prenda o worker inteiro.
+"""
+import os
+
+# Com este arquivo, basta rodar `gunicorn` na raiz do projeto
+wsgi_app = "wsgi:application"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = 1
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+# No gthread o timeout vale para o worker como um todo, não para cada requisição: streams longos não são encerrados
+timeout = 60
+
+# Com threads, a interface pode acompanhar as buscas pelo /events em vez de consultar /get_results
+os.environ.setdefault("VAX_EVENT_STREAM", "1")
@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class SearchJob:
+    """Estado de uma busca: parâmetros, flags de controle, resultados e contadores.
+
+    Pode ser lido e alterado a partir das threads do Flask e do event loop do motor ao
+    mesmo tempo; tudo que é mutável passa pelo `lock` do próprio job.
+    """
+
+    def __init__(self, search_term, cities, state, max_pages, num_threads, resume=False, key=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.search_term = search_term
+        self.cities = cities
+        self.state = state
+        self.max_pages = max_pages
+        self.num_threads = num_threads
+        self.resume = resume
+        self.key = key
+        self.created_at = time.time()
+        self.finished_at = None
+        self.running = True
+        self.paused = False
+        self.stopped = False
+        self.future = None
+        self.results = []
+        self.cities_found = set()
+        self.cnpjs = set()
+        self.plan = None
+        # estágio -> [chamadas, tempo total, maior tempo], para o resumo de tempos do /dashboard
+        self.timings = {}
+        self.lock = threading.Lock()
+
+    @property
+    def status(self):
+        if self.finished_at is not None:
+            return "finished"
+        if self.stopped:
+            return "stopping"
+        return "paused" if self.paused else "running"
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def toggle_pause(self):
+        with self.lock:
+            self.paused = not self.paused
+            return self.paused
+
+    def stop(self):
+        with self.lock:
+            self.stopped = True
+            self.running = False
+
+    def finish(self):
+        with self.lock:
+            self.running = False
+            self.paused = False
+            self.finished_at = time.time()
+
+    async def wait_if_paused(self):
+        while self.paused and not self.stopped:
+            await asyncio.sleep(1)
+
+    def claim_cnpj(self, cnpj):
+        """Reserva o CNPJ para esta busca; False se ele já foi encontrado antes (não é um lead novo)."""
+        with self.lock:
+            if cnpj in self.cnpjs:
+                return False
+            self.cnpjs.add(cnpj)
+            return True
+
+    def add_result(self, result_data):
+        """Guarda um resultado e retorna o índice dele (o cursor usado pelo /get_results)."""
+        with self.lock:
+            self.results.append(result_data)
+            if "Localização" in result_data:
+                self.cities_found.add(result_data["Localização"])
+            return len(self.results) - 1
+
+    def record_timing(self, stage, seconds):
+        with self.lock:
+            stats = self.timings.setdefault(stage, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def timing_summary(self):
+        with self.lock:
+            return {stage: {"count": count, "total_s": round(total, 3), "avg_ms": round(total / count * 1000, 1),
+                            "max_ms": round(longest * 1000, 1)}
+                    for stage, (count, total, longest) in self.timings.items()}
+
+    def results_since(self, index):
+        with self.lock:
+            return self.results[index:]
+
+    def iter_results(self, chunk_size=500):
+        """Percorre os resultados em blocos, sem copiar a lista inteira nem segurar o lock entre blocos."""
+        index = 0
+        while True:
+            with self.lock:
+                chunk = self.results[index:index + chunk_size]
+            if not chunk:
+                return
+            yield from chunk
+            index += len(chunk)
+
+    def summary(self):
+        with self.lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "search_term": self.search_term,
+                "state": self.state,
+                "cities": self.cities,
+                "max_pages": self.max_pages,
+                "num_threads": self.num_threads,
+                "resume": self.resume,
+                "results": len(self.results),
+                "cities_searched": len(self.cities_found),
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class DuplicateSearch(Exception):
+    """Já existe uma busca em andamento com a mesma chave (mesmos parâmetros)."""
+
+
+class JobRegistry:
+    """Buscas do processo, por ID. Guarda só as `max_finished` buscas encerradas mais recentes."""
+
+    def __init__(self, max_running, max_finished):
+        self.max_running = max_running
+        self.max_finished = max_finished
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def create(self, *args, key=None):
+        """Cria e registra um job; retorna None se já há `max_running` buscas em andamento.
+
+        Levanta DuplicateSearch se outra busca com a mesma `key` ainda está em andamento; a checagem e o
+        registro acontecem sob o mesmo lock, para duas requisições iguais não começarem juntas.
+        """
+        with self.lock:
+            running = [job for job in self.jobs.values() if not job.done]
+            if key is not None and any(job.key == key for job in running):
+                raise DuplicateSearch(key)
+            if len(running) >= self.max_running:
+                return None
+            job = SearchJob(*args, key=key)
+            self.jobs[job.id] = job
+            finished = [job_id for job_id, old in self.jobs.items() if old.done]
+            for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+                del self.jobs[job_id]
+            return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def latest(self):
+        with self.lock:
+            return next(reversed(self.jobs.values()), None)
+
+    def all(self):
+        with self.lock:
+            return list(self.jobs.values())
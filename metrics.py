@@ -0,0 +1,165 @@
+"""Métricas do processo no formato de texto do Prometheus (exposto em /metrics).
+
+Contadores, gauges e histogramas com rótulos, seguros entre as threads do Flask, o event loop
+do motor e as threads de parsing. Valores que já existem em outros objetos (cache de CNPJ, pool
+de proxies, buscas em andamento) entram por `Registry.callback`, lidos só na hora da coleta.
+"""
+import bisect
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels_text(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        with self.lock:
+            values = list(self.values.items())
+        return self.header() + [f"{self.name}{_labels_text(self.label_names, key)} {_number(value)}"
+                                for key, value in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        with self.lock:
+            values = [(key, list(counts), total, count) for key, (counts, total, count) in self.values.items()]
+        lines = self.header()
+        names = self.label_names + ("le",)
+        for key, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels_text(names, key + (_number(bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels_text(self.label_names, key)} {count}")
+        return lines
+
+
+class _Callback(_Metric):
+    def __init__(self, name, documentation, kind, labels, collect):
+        super().__init__(name, documentation, labels)
+        self.kind = kind
+        self.collect = collect
+
+    def render(self):
+        # `collect()` retorna {tupla de valores dos rótulos: valor}, ou só o valor quando não há rótulos
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return self.header() + [f"{self.name}{_labels_text(self.label_names, key)} {_number(value)}"
+                                for key, value in values.items()]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self._add(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()):
+        return self._add(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, documentation, labels, buckets))
+
+    def callback(self, name, documentation, collect, kind="gauge", labels=()):
+        return self._add(_Callback(name, documentation, kind, labels, collect))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = Registry()
+
+# Estágios do motor: serp_fetch, serp_parse, detail_fetch, detail_parse, extract e cnpj_api
+stage_seconds = registry.histogram(
+    "vaxbuscas_stage_seconds", "Duração de cada estágio do motor de busca, em segundos.", ["stage"])
+requests_total = registry.counter(
+    "vaxbuscas_http_requests_total", "Requisições HTTP feitas pelo motor, por estágio e resultado.", ["stage", "outcome"])
+bytes_total = registry.counter(
+    "vaxbuscas_http_bytes_total", "Bytes de corpo de resposta baixados, por estágio.", ["stage"])
+proxy_failures_total = registry.counter(
+    "vaxbuscas_proxy_failures_total", "Requisições que falharam ou foram bloqueadas por causa do proxy.")
+results_total = registry.counter(
+    "vaxbuscas_results_total", "Resultados (CNPJs novos) encontrados pelas buscas.")
+queue_depth = registry.gauge(
+    "vaxbuscas_queue_depth", "Trabalho aguardando em cada fila do motor.", ["queue"])
+in_flight = registry.gauge(
+    "vaxbuscas_in_flight", "Requisições em andamento, por estágio.", ["stage"])
@@ -0,0 +1,158 @@
+"""Backends de parsing de HTML usados nas páginas do Bing e nas páginas de detalhe.
+
+Todos expõem a mesma interface:
+
+- `page(html)` -> (texto visível, lista de hrefs)
+- `serp(html)` -> (lista de (título, url) dos resultados, trecho do <body> para depuração)
+
+O backend é escolhido por `config.PARSER_BACKEND`: "selectolax" e "lxml" são parsers em C,
+bem mais rápidos que o "html.parser" do BeautifulSoup, que continua como fallback quando
+as dependências opcionais não estão instaladas. "auto" usa o mais rápido disponível.
+"""
+import logging
+
+import config
+
+logger = logging.getLogger("vaxbuscas")
+
+# Seletores tentados em ordem para os resultados do Bing
+SERP_SELECTORS = ["li.b_algo", "div.b_title", "div.organic"]
+SERP_XPATHS = [
+    "//li[contains(concat(' ', normalize-space(@class), ' '), ' b_algo ')]",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' b_title ')]",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' organic ')]",
+]
+TITLE_CLASS_XPATH = ".//*[contains(concat(' ', normalize-space(@class), ' '), ' title ')]"
+
+
+class SoupBackend:
+    name = "html.parser"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self.BeautifulSoup = BeautifulSoup
+
+    def page(self, html):
+        soup = self.BeautifulSoup(html, "html.parser")
+        return soup.get_text(), [a.get('href') for a in soup.find_all('a', href=True)]
+
+    def serp(self, html):
+        soup = self.BeautifulSoup(html, "html.parser")
+        items = []
+        for selector in SERP_SELECTORS:
+            results = soup.select(selector)
+            if results:
+                break
+        for result in results:
+            title_elem = result.select_one("h2") or result.select_one(".title")
+            link_element = result.select_one("a")
+            items.append((
+                title_elem.text.strip() if title_elem else "N/A",
+                link_element["href"] if link_element and "href" in link_element.attrs else "N/A",
+            ))
+        return items, str(soup.body)[:500]
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        self.lxml_html = lxml.html
+        # O texto já chega decodificado: a codificação fixa faz o lxml ignorar <?xml encoding=...?> e
+        # <meta charset>, que com str levantariam ValueError e com bytes trocariam a decodificação
+        self.parser = lxml.html.HTMLParser(encoding="utf-8")
+
+    def parse(self, html):
+        if not html.strip():
+            html = "<html></html>"
+        return self.lxml_html.document_fromstring(html.encode("utf-8", errors="replace"), parser=self.parser)
+
+    def page(self, html):
+        doc = self.parse(html)
+        text = "".join(doc.xpath("//text()[not(parent::script or parent::style)]"))
+        return text, doc.xpath("//a/@href")
+
+    def serp(self, html):
+        doc = self.parse(html)
+        items = []
+        for xpath in SERP_XPATHS:
+            results = doc.xpath(xpath)
+            if results:
+                break
+        for result in results:
+            title_elem = (result.xpath(".//h2") or result.xpath(TITLE_CLASS_XPATH) or [None])[0]
+            link_element = (result.xpath(".//a") or [None])[0]
+            href = link_element.get("href") if link_element is not None else None
+            items.append((
+                title_elem.text_content().strip() if title_elem is not None else "N/A",
+                href if href is not None else "N/A",
+            ))
+        body = doc.find("body")
+        snippet = self.lxml_html.tostring(body, encoding="unicode") if body is not None else "None"
+        return items, snippet[:500]
+
+
+class SelectolaxBackend:
+    name = "selectolax"
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser as HTMLParser
+        except ImportError:
+            from selectolax.parser import HTMLParser
+        self.HTMLParser = HTMLParser
+
+    def page(self, html):
+        tree = self.HTMLParser(html)
+        links = [a.attributes.get("href") for a in tree.css("a[href]")]
+        tree.strip_tags(["script", "style"])
+        return tree.text(), [link for link in links if link is not None]
+
+    def serp(self, html):
+        tree = self.HTMLParser(html)
+        items = []
+        for selector in SERP_SELECTORS:
+            results = tree.css(selector)
+            if results:
+                break
+        for result in results:
+            title_elem = result.css_first("h2") or result.css_first(".title")
+            link_element = result.css_first("a")
+            href = link_element.attributes.get("href") if link_element is not None else None
+            items.append((
+                title_elem.text().strip() if title_elem is not None else "N/A",
+                href if href is not None else "N/A",
+            ))
+        return items, (tree.body.html if tree.body is not None else "None")[:500]
+
+
+BACKENDS = {
+    "selectolax": SelectolaxBackend,
+    "lxml": LxmlBackend,
+    "html.parser": SoupBackend,
+}
+
+
+def available_backends():
+    backends = []
+    for name, cls in BACKENDS.items():
+        try:
+            backends.append(cls())
+        except ImportError:
+            pass
+    return backends
+
+
+def load_backend(name):
+    """Instancia o backend pedido; se a dependência não estiver instalada, usa o html.parser."""
+    if name == "auto":
+        return available_backends()[0]
+    try:
+        return BACKENDS[name]()
+    except ImportError:
+        logger.warning(f"Parser '{name}' não disponível, usando html.parser.")
+        return SoupBackend()
+
+
+backend = load_backend(config.PARSER_BACKEND)
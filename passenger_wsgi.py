@@ -7,4 +7,7 @@ if sys.executable != INTERP:
     os.execl(INTERP, INTERP, *sys.argv)
 
 sys.path.append(os.getcwd())
-from app import app as application
\ No newline at end of file
+from app import create_app
+
+# Só as rotas e o estado leve; o motor de busca é carregado na primeira busca
+application = create_app()
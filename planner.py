@@ -0,0 +1,119 @@
+import asyncio
+
+
+class Branch:
+    """Uma combinação (cidade, site prioritário), paginada em sequência até `max_pages`."""
+
+    def __init__(self, city, site, max_pages, prior):
+        self.city = city
+        self.site = site
+        self.max_pages = max_pages
+        self.prior = prior
+        self.next_page = 1
+        self.pages_done = 0
+        self.new_cnpjs = 0
+        self.in_flight = False
+        self.exhausted = False
+        self.failed = False
+
+    @property
+    def available(self):
+        return not self.in_flight and not self.exhausted and self.next_page <= self.max_pages
+
+    @property
+    def score(self):
+        # Média de CNPJs novos por página, começando pela média histórica do site
+        return (self.new_cnpjs + self.prior) / (self.pages_done + 1)
+
+
+class WorkUnit:
+    def __init__(self, branch, page):
+        self.branch = branch
+        self.page = page
+
+    @property
+    def key(self):
+        """Identificador da unidade no checkpoint da fronteira."""
+        return f"{self.branch.city}|{self.branch.site}|{self.page}"
+
+    def __repr__(self):
+        return f"{self.branch.city} / {self.branch.site} / página {self.page}"
+
+
+class QueryPlan:
+    """Plano de uma busca: uma consulta por (cidade × site prioritário × página).
+
+    Cada ramo (cidade, site) é paginado em ordem e para na primeira página que não traz CNPJs
+    novos. Entre os ramos disponíveis, `next()` entrega sempre o de maior rendimento até agora;
+    ramos ainda não visitados usam o rendimento histórico do site (`priors`) e, na falta dele,
+    `default_prior`, otimista para que todo ramo seja experimentado ao menos uma vez.
+
+    `done` traz as páginas concluídas numa execução anterior ({chave da unidade: CNPJs novos}), que
+    não voltam para o plano mas contam no rendimento do ramo, inclusive para a parada antecipada.
+    """
+
+    def __init__(self, cities, sites, max_pages, priors=None, default_prior=10, done=None):
+        priors = priors or {}
+        self.branches = [Branch(city, site, max_pages, priors.get(site, default_prior))
+                         for city in cities for site in sites]
+        self.done = dict(done or {})
+        self.changed = asyncio.Event()
+        for branch in self.branches:
+            self._skip_done(branch)
+
+    def _skip_done(self, branch):
+        while not branch.exhausted and branch.next_page <= branch.max_pages:
+            key = WorkUnit(branch, branch.next_page).key
+            if key not in self.done:
+                break
+            self._advance(branch, self.done[key])
+
+    def _advance(self, branch, new_cnpjs):
+        branch.next_page += 1
+        # None: a página não diz nada sobre o ramo (todas as URLs dela já tinham sido pegas por outras páginas)
+        if new_cnpjs is None:
+            return
+        branch.pages_done += 1
+        branch.new_cnpjs += new_cnpjs
+        if not new_cnpjs:
+            branch.exhausted = True
+
+    @property
+    def finished(self):
+        return not any(branch.available or branch.in_flight for branch in self.branches)
+
+    async def next(self):
+        """Próxima unidade de trabalho, ou None quando o plano acabou."""
+        while True:
+            available = [branch for branch in self.branches if branch.available]
+            if available:
+                branch = max(available, key=lambda branch: (branch.score, -branch.pages_done))
+                branch.in_flight = True
+                return WorkUnit(branch, branch.next_page)
+            if self.finished:
+                return None
+            # Só há páginas em andamento: espera alguma terminar para liberar a próxima do ramo
+            self.changed.clear()
+            await self.changed.wait()
+
+    def report(self, unit, new_cnpjs, failed=False):
+        """Registra quantos CNPJs novos a página trouxe.
+
+        `failed` indica que a página não foi concluída; `new_cnpjs` None, que ela foi concluída mas
+        só tinha URLs já pegas por outras páginas da busca, e por isso não encerra o ramo.
+        """
+        branch = unit.branch
+        branch.in_flight = False
+        if failed:
+            # Sem repetir agora: o ramo fica para trás e é retomado pelo checkpoint
+            branch.exhausted = branch.failed = True
+        else:
+            self._advance(branch, new_cnpjs)
+            self._skip_done(branch)
+        self.changed.set()
+
+    def summary(self):
+        return [{"city": branch.city, "site": branch.site, "pages": branch.pages_done,
+                 "new_cnpjs": branch.new_cnpjs, "failed": branch.failed,
+                 "stopped_early": branch.exhausted and not branch.failed and branch.next_page <= branch.max_pages}
+                for branch in sorted(self.branches, key=lambda branch: -branch.new_cnpjs)]
@@ -0,0 +1,166 @@
+import asyncio
+import random
+import threading
+import time
+
+import config
+
+
+class ProxyStats:
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.strikes = 0
+        self.latency = None
+        self.cooldown_until = 0
+        self.ejected = False
+
+    @property
+    def success_rate(self):
+        # Suavizado para um proxy novo não começar com nota 0 nem 1
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    @property
+    def score(self):
+        latency = self.latency if self.latency is not None else config.PROXY_CHECK_TIMEOUT / 2
+        return self.success_rate / max(latency, 0.05)
+
+    def as_dict(self, now):
+        return {
+            "proxy": self.proxy,
+            "successes": self.successes,
+            "failures": self.failures,
+            "success_rate": round(self.success_rate, 3),
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "cooling_down": self.cooldown_until > now,
+            "ejected": self.ejected,
+        }
+
+
+class ProxyPool:
+    """Proxies com nota (taxa de sucesso / latência) e rotação ponderada pela nota a cada requisição.
+
+    Um proxy que falha `max_failures` vezes seguidas fica de fora por um tempo que dobra a cada
+    reincidência; depois de `max_strikes` reincidências ele é descartado.
+    """
+
+    def __init__(self, cooldown=config.PROXY_COOLDOWN, max_failures=config.PROXY_MAX_FAILURES,
+                 max_strikes=config.PROXY_MAX_STRIKES):
+        self.cooldown = cooldown
+        self.max_failures = max_failures
+        self.max_strikes = max_strikes
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def load(self, proxies):
+        with self.lock:
+            self.stats = {proxy: ProxyStats(proxy) for proxy in proxies}
+
+    def __len__(self):
+        return len(self.stats)
+
+    def proxies(self):
+        with self.lock:
+            return list(self.stats)
+
+    def healthy(self):
+        now = time.time()
+        with self.lock:
+            return [stats.proxy for stats in self.stats.values() if not stats.ejected and stats.cooldown_until <= now]
+
+    def choose(self):
+        """Sorteia um proxy saudável com probabilidade proporcional à nota; None se não houver."""
+        now = time.time()
+        with self.lock:
+            candidates = [stats for stats in self.stats.values() if not stats.ejected and stats.cooldown_until <= now]
+            if not candidates:
+                return None
+            return random.choices(candidates, weights=[stats.score for stats in candidates])[0].proxy
+
+    def report(self, proxy, ok, latency=None):
+        with self.lock:
+            stats = self.stats.get(proxy)
+            if stats is None:
+                return
+            if ok:
+                stats.successes += 1
+                stats.consecutive_failures = 0
+                if latency is not None:
+                    stats.latency = latency if stats.latency is None else 0.8 * stats.latency + 0.2 * latency
+                return
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= self.max_failures:
+                stats.consecutive_failures = 0
+                stats.strikes += 1
+                if stats.strikes > self.max_strikes:
+                    stats.ejected = True
+                else:
+                    stats.cooldown_until = time.time() + self.cooldown * 2 ** (stats.strikes - 1)
+
+    def mark_checked(self, proxy, latency):
+        """Registra um teste bem-sucedido, devolvendo o proxy à rotação mesmo que estivesse descartado."""
+        with self.lock:
+            stats = self.stats.get(proxy)
+            if stats is None:
+                return
+            stats.ejected = False
+            stats.strikes = 0
+            stats.cooldown_until = 0
+            stats.consecutive_failures = 0
+            stats.successes += 1
+            stats.latency = latency
+
+    def eject(self, proxy):
+        with self.lock:
+            if proxy in self.stats:
+                self.stats[proxy].ejected = True
+
+    def summary(self):
+        now = time.time()
+        with self.lock:
+            return sorted((stats.as_dict(now) for stats in self.stats.values()),
+                          key=lambda item: (item["ejected"], -item["success_rate"]))
+
+
+class ProxyCheck:
+    """Teste de todos os proxies do pool em paralelo, com progresso consultável durante a execução."""
+
+    def __init__(self, pool, check, concurrency=config.PROXY_CHECK_CONCURRENCY):
+        self.pool = pool
+        self.check = check
+        self.concurrency = concurrency
+        self.total = len(pool)
+        self.current = 0
+        self.valid = 0
+        self.running = False
+
+    def progress(self):
+        return {"running": self.running, "total": self.total, "current": self.current, "valid": self.valid}
+
+    async def run(self, on_result=None):
+        """`check(proxy)` deve retornar a latência em segundos ou levantar exceção se o proxy falhou."""
+        self.running = True
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def check_one(proxy):
+            async with semaphore:
+                try:
+                    latency = await self.check(proxy)
+                except Exception as e:
+                    self.pool.eject(proxy)
+                    error = e
+                else:
+                    self.pool.mark_checked(proxy, latency)
+                    self.valid += 1
+                    error = None
+            self.current += 1
+            if on_result:
+                on_result(proxy, error)
+
+        try:
+            await asyncio.gather(*[check_one(proxy) for proxy in self.pool.proxies()])
+        finally:
+            self.running = False
@@ -0,0 +1,138 @@
+import asyncio
+import collections
+import time
+
+import config
+
+
+class TokenBucket:
+    """Limita o ritmo de requisições a `rate` por segundo, permitindo rajadas de até `burst`.
+
+    `block(seconds)` esvazia o balde e segura todo mundo pelo tempo pedido (ex.: Retry-After de um 429).
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        # O lock faz a fila andar na ordem de chegada
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def block(self, seconds):
+        now = time.monotonic()
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.tokens = 0
+        self.updated = now
+
+
+class AimdLimiter:
+    """Limite de requisições simultâneas que se ajusta sozinho (aumento aditivo, redução multiplicativa).
+
+    Cada resposta rápida soma 1/limite (≈ +1 por rodada completa); sobrecarga (429/503, timeout ou
+    latência acima de `latency_target`) multiplica o limite por `decrease`, no máximo uma vez por
+    `latency_target` segundos, para que uma leva de erros simultâneos conte como um sinal só.
+    """
+
+    def __init__(self, initial, minimum, maximum, latency_target, decrease=0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.in_flight = 0
+        self.last_decrease = 0
+        self.waiters = collections.deque()
+
+    async def acquire(self):
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self, latency=None, overloaded=False):
+        self.in_flight -= 1
+        if overloaded or (latency is not None and latency > self.latency_target):
+            now = time.monotonic()
+            if now - self.last_decrease >= self.latency_target:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self.last_decrease = now
+        elif latency is not None:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+class HostThrottle:
+    """Ritmo (token bucket) e concorrência (AIMD) de um host."""
+
+    def __init__(self, host, rate, burst, maximum):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.limiter = AimdLimiter(config.AIMD_INITIAL, config.AIMD_MIN, maximum, config.AIMD_LATENCY_TARGET)
+
+    async def acquire(self):
+        await self.limiter.acquire()
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            self.limiter.release()
+            raise
+
+    def release(self, latency=None, overloaded=False, retry_after=None):
+        if retry_after:
+            self.bucket.block(retry_after)
+        self.limiter.release(latency, overloaded)
+
+    def summary(self):
+        return {
+            "host": self.host,
+            "rate": self.bucket.rate,
+            "concurrency": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "waiting": len(self.limiter.waiters),
+        }
+
+
+def host_budget(host):
+    """Retorna (nome do orçamento, requisições/segundo, rajada) de um host.
+
+    Bing e BrasilAPI têm orçamento próprio, dividido entre todos os seus subdomínios; cada
+    outro host (os sites de destino) recebe um orçamento padrão só dele.
+    """
+    for domain, rate in (("bing.com", config.RATE_LIMIT_BING), ("brasilapi.com.br", config.RATE_LIMIT_CNPJ_API)):
+        if host == domain or host.endswith("." + domain):
+            return domain, rate, config.RATE_BURST
+    return host, config.RATE_LIMIT_DEFAULT, config.RATE_BURST
@@ -0,0 +1,57 @@
+# Dicionário de estados e cidades (10 principais cidades por estado)
+states_cities = {
+    "AC": ["Rio Branco", "Cruzeiro do Sul", "Sena Madureira", "Tarauacá", "Feijó",
+           "Brasiléia", "Xapuri", "Senador Guiomard", "Plácido de Castro", "Mâncio Lima"],
+    "AL": ["Maceió", "Arapiraca", "Palmeira dos Índios", "Rio Largo", "Penedo",
+           "União dos Palmares", "São Miguel dos Campos", "Coruripe", "Delmiro Gouveia", "Marechal Deodoro"],
+    "AM": ["Manaus", "Parintins", "Itacoatiara", "Manacapuru", "Coari",
+           "Tefé", "Tabatinga", "Maués", "Humaitá", "Eirunepé"],
+    "AP": ["Macapá", "Santana", "Laranjal do Jari", "Oiapoque", "Mazagão",
+           "Porto Grande", "Tartarugalzinho", "Amapá", "Pedra Branca do Amapari", "Calçoene"],
+    "BA": ["Salvador", "Feira de Santana", "Vitória da Conquista", "Camaçari", "Juazeiro",
+           "Lauro de Freitas", "Ilhéus", "Jequié", "Teixeira de Freitas", "Alagoinhas"],
+    "CE": ["Fortaleza", "Juazeiro do Norte", "Sobral", "Caucaia", "Maracanaú",
+           "Crato", "Itapipoca", "Maranguape", "Quixadá", "Canindé"],
+    "DF": ["Brasília", "Ceilândia", "Taguatinga", "Samambaia", "Planaltina",
+           "Gama", "Santa Maria", "São Sebastião", "Recanto das Emas", "Águas Claras"],
+    "ES": ["Vitória", "Vila Velha", "Cariacica", "Serra", "Linhares",
+           "Cachoeiro de Itapemirim", "Colatina", "Guarapari", "São Mateus", "Aracruz"],
+    "GO": ["Goiânia", "Aparecida de Goiânia", "Anápolis", "Rio Verde", "Luziânia",
+           "Trindade", "Formosa", "Catalão", "Itumbiara", "Jataí"],
+    "MA": ["São Luís", "Imperatriz", "Caxias", "Timon", "Codó",
+           "Paço do Lumiar", "Açailândia", "Bacabal", "Balsas", "Santa Inês"],
+    "MG": ["Belo Horizonte", "Uberlândia", "Contagem", "Juiz de Fora", "Betim",
+           "Montes Claros", "Ribeirão das Neves", "Uberaba", "Sete Lagoas", "Divinópolis"],
+    "MS": ["Campo Grande", "Dourados", "Três Lagoas", "Corumbá", "Ponta Porã",
+           "Naviraí", "Nova Andradina", "Aquidauana", "Sidrolândia", "Paranaíba"],
+    "MT": ["Cuiabá", "Várzea Grande", "Rondonópolis", "Sinop", "Tangará da Serra",
+           "Cáceres", "Sorriso", "Lucas do Rio Verde", "Barra do Garças", "Primavera do Leste"],
+    "PA": ["Belém", "Ananindeua", "Santarém", "Marabá", "Parauapebas",
+           "Castanhal", "Abaetetuba", "Cametá", "Bragança", "Tucuruí"],
+    "PB": ["João Pessoa", "Campina Grande", "Santa Rita", "Patos", "Bayeux",
+           "Sousa", "Cajazeiras", "Cabedelo", "Guarabira", "Sapé"],
+    "PE": ["Recife", "Jaboatão dos Guararapes", "Olinda", "Caruaru", "Petrolina",
+           "Paulista", "Cabo de Santo Agostinho", "Camaragibe", "Garanhuns", "Vitória de Santo Antão"],
+    "PI": ["Teresina", "Parnaíba", "Picos", "Floriano", "Piripiri",
+           "Campo Maior", "Barras", "União", "Altos", "José de Freitas"],
+    "PR": ["Curitiba", "Londrina", "Maringá", "Ponta Grossa", "Cascavel",
+           "São José dos Pinhais", "Foz do Iguaçu", "Colombo", "Guarapuava", "Paranaguá"],
+    "RJ": ["Rio de Janeiro", "Niterói", "Duque de Caxias", "São Gonçalo", "Nova Iguaçu",
+           "Belford Roxo", "Campos dos Goytacazes", "São João de Meriti", "Petrópolis", "Volta Redonda"],
+    "RN": ["Natal", "Mossoró", "Parnamirim", "São Gonçalo do Amarante", "Macaíba",
+           "Ceará-Mirim", "Caicó", "Assú", "Currais Novos", "Santa Cruz"],
+    "RO": ["Porto Velho", "Ji-Paraná", "Ariquemes", "Vilhena", "Cacoal",
+           "Rolim de Moura", "Guajará-Mirim", "Jaru", "Ouro Preto do Oeste", "Pimenta Bueno"],
+    "RR": ["Boa Vista", "Rorainópolis", "Caracaraí", "Mucajaí", "Alto Alegre",
+           "Pacaraima", "Bonfim", "Cantá", "Normandia", "Uiramutã"],
+    "RS": ["Porto Alegre", "Caxias do Sul", "Pelotas", "Canoas", "Santa Maria",
+           "Gravataí", "Viamão", "Novo Hamburgo", "São Leopoldo", "Rio Grande"],
+    "SC": ["Florianópolis", "Joinville", "Blumenau", "São José", "Criciúma",
+           "Chapecó", "Itajaí", "Jaraguá do Sul", "Lages", "Balneário Camboriú"],
+    "SE": ["Aracaju", "Nossa Senhora do Socorro", "Lagarto", "Itabaiana", "São Cristóvão",
+           "Estância", "Tobias Barreto", "Propriá", "Barra dos Coqueiros", "Simão Dias"],
+    "SP": ["São Paulo", "Campinas", "Santos", "São Bernardo do Campo", "Santo André",
+           "Osasco", "São José dos Campos", "Ribeirão Preto", "Sorocaba", "Mauá"],
+    "TO": ["Palmas", "Araguaína", "Gurupi", "Porto Nacional", "Paraíso do Tocantins",
+           "Colinas do Tocantins", "Guaraí", "Dianópolis", "Miracema do Tocantins", "Formoso do Araguaia"]
+}
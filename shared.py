@@ -0,0 +1,102 @@
+"""Estado compartilhado entre as rotas (app.py) e o motor de busca (crawler.py).
+
+Só objetos leves, para que um worker do gunicorn/Passenger que atende apenas páginas e
+consultas não carregue o motor (aiohttp, parsers, extrator) antes da primeira busca.
+"""
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+
+import applog
+import config
+import metrics
+from events import EventBroker
+from jobs import JobRegistry
+from proxies import ProxyPool
+
+# O estado de cada busca fica no SearchJob correspondente; aqui ficam só os proxies,
+# as estatísticas acumuladas entre buscas e o registro das buscas do processo.
+proxy_pool = ProxyPool()
+proxy_check = None
+saved_cnpjs = set()
+monthly_cnpjs = Counter()
+city_cnpj_count = Counter()
+stats_lock = threading.Lock()
+jobs = JobRegistry(config.MAX_RUNNING_JOBS, config.MAX_FINISHED_JOBS)
+events = EventBroker()
+
+# Configurado por setup_logging(); antes disso as mensagens vão só para o logger padrão do Python
+logger = logging.getLogger("vaxbuscas")
+log_buffer = None
+frontier = None
+setup_lock = threading.Lock()
+
+
+def setup_logging():
+    """Liga o buffer da interface, o console e o arquivo JSONL ao logger (só na primeira chamada)."""
+    global logger, log_buffer
+    with setup_lock:
+        if log_buffer is None:
+            logger, log_buffer = applog.setup(
+                "vaxbuscas", config.LOG_LEVEL, config.LOG_BUFFER_SIZE, config.LOG_FILE,
+                config.LOG_FILE_MAX_BYTES, config.LOG_FILE_BACKUPS,
+                on_record=lambda log: events.publish("log", {"index": log["index"], "log": log}))
+    return log_buffer
+
+
+def log_message(message, level="info"):
+    """Adiciona uma mensagem ao log com timestamp e nível (debug, info, warning ou error)."""
+    logger.log(applog.LEVELS[level], message)
+
+
+def log_enabled(level):
+    """Permite pular a montagem de mensagens caras quando o nível está desativado."""
+    return logger.isEnabledFor(applog.LEVELS[level])
+
+
+def get_frontier():
+    """Progresso persistente das buscas e índice de URLs já visitadas."""
+    global frontier
+    with setup_lock:
+        if frontier is None:
+            from frontier import Frontier
+            frontier = Frontier()
+    return frontier
+
+
+def dashboard_counters(job=None):
+    current_month = datetime.now().strftime("%Y-%m")
+    with stats_lock:
+        top_city = city_cnpj_count.most_common(1)
+        monthly_count = monthly_cnpjs[current_month]
+    top_city_text = top_city[0][0] + f" ({top_city[0][1]})" if top_city else "N/A"
+    return {
+        "cities_searched": len(job.cities_found) if job else 0,
+        "top_city": top_city_text,
+        "monthly_cnpjs": monthly_count
+    }
+
+
+def add_result(job, result_data, restored=False):
+    """Registra um resultado da busca, atualiza os contadores do dashboard e avisa os clientes do /events.
+
+    Resultados `restored` vêm de um checkpoint e já foram contados nas estatísticas quando encontrados.
+    """
+    if not restored:
+        current_month = datetime.now().strftime("%Y-%m")
+        with stats_lock:
+            monthly_cnpjs[current_month] += 1
+            city_cnpj_count[result_data["Localização"]] += 1
+        metrics.results_total.inc()
+    index = job.add_result(result_data)
+    events.publish("result", {"search": job.id, "index": index, "result": result_data}, job=job.id)
+    events.publish("dashboard", dashboard_counters(job), job=job.id)
+
+
+metrics.registry.callback(
+    "vaxbuscas_proxies", "Proxies carregados e proxies disponíveis para rotação.",
+    lambda: {("total",): len(proxy_pool), ("healthy",): len(proxy_pool.healthy())}, labels=["state"])
+metrics.registry.callback(
+    "vaxbuscas_running_searches", "Buscas em andamento.",
+    lambda: sum(not job.done for job in jobs.all()))
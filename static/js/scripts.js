@@ -1,3 +1,10 @@
+// Busca acompanhada por esta página; as rotas /jobs/<id>/... permitem várias buscas simultâneas
+let currentJob = null;
+
+function jobUrl(path, legacyPath) {
+    return currentJob ? `/jobs/${currentJob}/${path}` : legacyPath;
+}
+
 function updateCities() {
     const state = document.getElementById('state').value;
     const citiesContainer = document.getElementById('cities_container');
@@ -50,7 +57,22 @@ function testProxies() {
         if (data.error) {
             alert(data.error);
         } else {
-            alert(data.message);
+            pollProxyStatus();
+        }
+    });
+}
+
+function pollProxyStatus() {
+    fetch('/proxy_status')
+    .then(response => response.json())
+    .then(data => {
+        const progress = document.getElementById('proxy_progress');
+        const check = data.check;
+        progress.textContent = `Testados ${check.current} de ${check.total} (${check.valid} válidos)`;
+        if (check.running) {
+            setTimeout(pollProxyStatus, 1000);
+        } else {
+            alert(`Teste concluído. ${check.valid} proxies válidos.`);
         }
     });
 }
@@ -61,16 +83,17 @@ function startSearch() {
     const cities = Array.from(document.querySelectorAll('#cities_container input:checked')).map(input => input.value);
     const maxPages = document.getElementById('max_pages').value;
     const numThreads = document.getElementById('num_threads').value;
+    const resume = document.getElementById('resume').checked;
 
     if (!searchTerm || !state || cities.length === 0) {
         alert('Por favor, preencha o termo de busca, selecione um estado e pelo menos uma cidade.');
         return;
     }
 
-    fetch('/start_search', {
+    fetch('/jobs', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ search_term: searchTerm, cities, state, max_pages: maxPages, num_threads: numThreads })
+        body: JSON.stringify({ search_term: searchTerm, cities, state, max_pages: maxPages, num_threads: numThreads, resume })
     })
     .then(response => response.json())
     .then(data => {
@@ -78,20 +101,20 @@ function startSearch() {
             alert(data.error);
         } else {
             alert(data.message);
-            pollResults();
-            updateDashboard();
+            currentJob = data.job_id;
+            connectEvents();
         }
     });
 }
 
 function pauseSearch() {
-    fetch('/pause_search', { method: 'POST' })
+    fetch(jobUrl('pause', '/pause_search'), { method: 'POST' })
     .then(response => response.json())
     .then(data => alert(data.message));
 }
 
 function stopSearch() {
-    fetch('/stop_search', { method: 'POST' })
+    fetch(jobUrl('stop', '/stop_search'), { method: 'POST' })
     .then(response => response.json())
     .then(data => alert(data.message));
 }
@@ -127,10 +150,11 @@ function closeModal() {
 
 function saveResults() {
     const fields = Array.from(document.querySelectorAll('#fields_container input:checked')).map(input => input.value);
-    fetch('/save_results', {
+    const format = document.getElementById('export_format').value;
+    fetch(jobUrl('save_results', '/save_results'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ fields })
+        body: JSON.stringify({ fields, format })
     })
     .then(response => {
         if (!response.ok) {
@@ -142,7 +166,7 @@ function saveResults() {
         const url = window.URL.createObjectURL(blob);
         const a = document.createElement('a');
         a.href = url;
-        a.download = `resultados_${new Date().toISOString().replace(/[:.]/g, '-')}.csv`;
+        a.download = `resultados_${new Date().toISOString().replace(/[:.]/g, '-')}.${format}`;
         a.click();
         window.URL.revokeObjectURL(url);
         closeModal();
@@ -152,30 +176,152 @@ function saveResults() {
     });
 }
 
-function pollResults() {
-    fetch('/get_results')
+// Cursores do /get_results: cada consulta traz só o que chegou depois da anterior.
+// Os eventos do /events trazem o mesmo índice, então as duas fontes podem se intercalar sem duplicar linhas.
+const cursors = { search: null, result: 0, log: 0 };
+let polling = false;
+let dashboardPolling = false;
+let eventSource = null;
+let catchingUp = false;
+let catchUpAgain = false;
+
+function appendLogLine(color, text) {
+    const logsDiv = document.getElementById('logs');
+    const p = document.createElement('p');
+    p.style.color = color;
+    p.textContent = text;
+    logsDiv.appendChild(p);
+    logsDiv.scrollTop = logsDiv.scrollHeight;
+}
+
+function showLog(log) {
+    const color = log.level === "info" ? "green" : log.level === "error" ? "red" : log.level === "debug" ? "gray" : "yellow";
+    appendLogLine(color, `[${log.timestamp}] ${log.message}`);
+}
+
+function showResult(result) {
+    appendLogLine("green", `Encontrado: ${result.Título} - ${result.URL} (CNPJ: ${result.CNPJ})`);
+}
+
+function renderDashboard(data) {
+    document.getElementById('cities_searched').textContent = data.cities_searched;
+    document.getElementById('top_city').textContent = data.top_city;
+    document.getElementById('monthly_cnpjs').textContent = data.monthly_cnpjs;
+}
+
+function fetchNewResults() {
+    const sinceResult = cursors.result;
+    return fetch(`${jobUrl('results', '/get_results')}?since_result=${sinceResult}&since_log=${cursors.log}`)
     .then(response => response.json())
     .then(data => {
-        const logsDiv = document.getElementById('logs');
         data.logs.forEach(log => {
-            const color = log.level === "info" ? "green" : log.level === "error" ? "red" : "yellow";
-            logsDiv.innerHTML += `<p style="color: ${color}">[${log.timestamp}] ${log.message}</p>`;
+            if (log.index >= cursors.log) {
+                showLog(log);
+            }
         });
-        data.results.forEach(result => {
-            logsDiv.innerHTML += `<p style="color: green">Encontrado: ${result.Título} - ${result.URL} (CNPJ: ${result.CNPJ})</p>`;
+        cursors.log = Math.max(cursors.log, data.next_log);
+
+        if (cursors.search !== null && data.search !== cursors.search) {
+            // Nova busca: os resultados recomeçam do zero
+            cursors.search = data.search;
+            cursors.result = 0;
+            catchUpAgain = true;
+            return;
+        }
+        cursors.search = data.search;
+        data.results.forEach((result, i) => {
+            if (sinceResult + i >= cursors.result) {
+                showResult(result);
+            }
         });
-        logsDiv.scrollTop = logsDiv.scrollHeight;
-        setTimeout(pollResults, 1000);
+        cursors.result = Math.max(cursors.result, data.next_result);
     });
 }
 
-function updateDashboard() {
-    fetch('/dashboard')
-    .then(response => response.json())
-    .then(data => {
-        document.getElementById('cities_searched').textContent = data.cities_searched;
-        document.getElementById('top_city').textContent = data.top_city;
-        document.getElementById('monthly_cnpjs').textContent = data.monthly_cnpjs;
-        setTimeout(updateDashboard, 5000);
+function catchUp() {
+    if (catchingUp) {
+        catchUpAgain = true;
+        return;
+    }
+    catchingUp = true;
+    catchUpAgain = false;
+    fetchNewResults()
+    .catch(() => {})
+    .finally(() => {
+        catchingUp = false;
+        if (catchUpAgain) {
+            catchUp();
+        }
     });
 }
+
+function connectEvents() {
+    // O stream só é usado quando o servidor roda com workers em threads (VAX_EVENT_STREAM=1)
+    if (!window.EventSource || document.body.dataset.eventStream !== '1') {
+        pollResults();
+        updateDashboard();
+        return;
+    }
+    if (eventSource) {
+        eventSource.close();
+    }
+    eventSource = new EventSource(jobUrl('events', '/events'));
+    // A cada (re)conexão, recupera pelos cursores o que chegou enquanto o stream estava fechado
+    eventSource.onopen = catchUp;
+    eventSource.addEventListener('log', event => {
+        const data = JSON.parse(event.data);
+        if (data.index < cursors.log) {
+            return;
+        }
+        if (data.index > cursors.log || catchingUp) {
+            catchUp();
+            return;
+        }
+        showLog(data.log);
+        cursors.log += 1;
+    });
+    eventSource.addEventListener('result', event => {
+        const data = JSON.parse(event.data);
+        if (data.search === cursors.search && data.index < cursors.result) {
+            return;
+        }
+        if (data.search !== cursors.search || data.index > cursors.result || catchingUp) {
+            catchUp();
+            return;
+        }
+        showResult(data.result);
+        cursors.result += 1;
+    });
+    eventSource.addEventListener('dashboard', event => renderDashboard(JSON.parse(event.data)));
+}
+
+function pollResults() {
+    if (polling) {
+        return;
+    }
+    polling = true;
+    const poll = () => {
+        catchUpAgain = false;
+        fetchNewResults()
+        .then(() => setTimeout(poll, catchUpAgain ? 0 : 1000))
+        .catch(() => setTimeout(poll, 5000));
+    };
+    poll();
+}
+
+function updateDashboard() {
+    if (dashboardPolling) {
+        return;
+    }
+    dashboardPolling = true;
+    const poll = () => {
+        fetch(jobUrl('dashboard', '/dashboard'))
+        .then(response => response.json())
+        .then(data => {
+            renderDashboard(data);
+            setTimeout(poll, 5000);
+        })
+        .catch(() => setTimeout(poll, 5000));
+    };
+    poll();
+}
@@ -0,0 +1,114 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import cnpj_cache
+from cnpj_cache import MISS, CnpjCache, CnpjEnricher
+
+CNPJ = "12.345.678/0001-90"
+DIGITS = "12345678000190"
+
+
+class FakeApi:
+    """`fetch` assíncrono que conta as chamadas; CNPJs em `missing` não existem e em `failing` dão erro."""
+
+    def __init__(self, missing=(), failing=(), delay=0):
+        self.missing = set(missing)
+        self.failing = set(failing)
+        self.delay = delay
+        self.calls = []
+
+    async def fetch(self, cnpj):
+        self.calls.append(cnpj)
+        await asyncio.sleep(self.delay)
+        if cnpj in self.failing:
+            raise ConnectionError("API fora do ar")
+        if cnpj in self.missing:
+            return None
+        return {"Situação Cadastral": "ATIVA", "cnpj": cnpj}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cnpj_cache, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def make_cache(**kwargs):
+    return CnpjCache(":memory:", **{"ttl": 100, "negative_ttl": 10, "memory_size": 100, **kwargs})
+
+
+def test_concurrent_lookups_of_the_same_cnpj_share_one_fetch():
+    api = FakeApi(delay=0.01)
+    enricher = CnpjEnricher(make_cache(), api.fetch)
+
+    async def scenario():
+        return await asyncio.gather(enricher.enrich_many([CNPJ]), enricher.enrich_many([DIGITS]))
+
+    first, second = asyncio.run(scenario())
+    assert api.calls == [DIGITS]
+    assert first[CNPJ] == second[DIGITS] == {"Situação Cadastral": "ATIVA", "cnpj": DIGITS}
+    assert (enricher.misses, enricher.shared) == (2, 1)
+
+
+def test_results_keep_the_caller_format_and_skip_invalid_cnpjs():
+    api = FakeApi()
+    enricher = CnpjEnricher(make_cache(), api.fetch)
+    found = asyncio.run(enricher.enrich_many([CNPJ, DIGITS, "123", None]))
+    assert set(found) == {CNPJ, DIGITS}
+    assert api.calls == [DIGITS]
+
+
+def test_cached_lookups_skip_the_api(clock):
+    api = FakeApi()
+    cache = make_cache()
+    asyncio.run(CnpjEnricher(cache, api.fetch).enrich_many([CNPJ]))
+    enricher = CnpjEnricher(cache, api.fetch)
+    asyncio.run(enricher.enrich_many([CNPJ]))
+    assert len(api.calls) == 1
+    assert (enricher.hits, enricher.misses) == (1, 0)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = make_cache()
+    cache.put(DIGITS, {"Situação Cadastral": "ATIVA"})
+    clock[0] += 99
+    assert cache.get(DIGITS) == {"Situação Cadastral": "ATIVA"}
+    clock[0] += 2
+    assert cache.get(DIGITS) is MISS
+
+
+def test_missing_cnpj_is_cached_with_its_own_ttl(clock):
+    api = FakeApi(missing={DIGITS})
+    cache = make_cache()
+    enricher = CnpjEnricher(cache, api.fetch)
+    assert asyncio.run(enricher.enrich_many([CNPJ])) == {CNPJ: None}
+    clock[0] += 9
+    assert asyncio.run(enricher.enrich_many([CNPJ])) == {CNPJ: None}
+    assert len(api.calls) == 1
+    clock[0] += 2
+    asyncio.run(enricher.enrich_many([CNPJ]))
+    assert len(api.calls) == 2
+
+
+def test_failed_lookups_are_not_cached():
+    api = FakeApi(failing={DIGITS})
+    cache = make_cache()
+    enricher = CnpjEnricher(cache, api.fetch)
+    assert asyncio.run(enricher.enrich_many([CNPJ])) == {}
+    assert cache.get(DIGITS) is MISS
+    asyncio.run(enricher.enrich_many([CNPJ]))
+    assert len(api.calls) == 2
+
+
+def test_memory_layer_evicts_least_recently_used_and_falls_back_to_disk():
+    cache = make_cache(memory_size=2)
+    cache.put("11111111000111", {"n": 1})
+    cache.put("22222222000122", {"n": 2})
+    cache.get("11111111000111")
+    cache.put("33333333000133", {"n": 3})
+    assert list(cache.memory) == ["11111111000111", "33333333000133"]
+    assert cache.get("22222222000122") == {"n": 2}
+    assert "22222222000122" in cache.memory
@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+
+import pytest
+
+import export
+
+RESULTS = [
+    {"Título": "Padaria Bela", "CNPJ": "12.345.678/0001-90", "Telefone": "(11) 3333-4444", "Email": "a@bela.com"},
+    {"Título": "Padaria Bela (filial)", "CNPJ": "12.345.678/0001-90", "Telefone": "(11) 5555-6666"},
+    {"Título": "Sem CNPJ", "CNPJ": "N/A", "Telefone": "N/A"},
+    {"Título": "Doceria, \"Doce\" Lar", "CNPJ": "98.765.432/0001-10", "Telefone": "(21) 2222-1111"},
+]
+FIELDS = ["Título", "CNPJ", "Email"]
+
+
+def read_csv(chunks):
+    return list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+
+
+def test_unique_rows_drops_repeated_cnpjs_and_projects_fields():
+    saved = []
+    rows = list(export.unique_rows(iter(RESULTS), FIELDS, on_cnpj=saved.append))
+    assert rows == [
+        ["Padaria Bela", "12.345.678/0001-90", "a@bela.com"],
+        ["Sem CNPJ", "N/A", ""],
+        ["Doceria, \"Doce\" Lar", "98.765.432/0001-10", ""],
+    ]
+    assert saved == ["12.345.678/0001-90", "98.765.432/0001-10"]
+
+
+def test_csv_stream_quotes_and_keeps_header():
+    rows = read_csv(export.stream("csv", RESULTS, FIELDS))
+    assert rows[0] == FIELDS
+    assert rows[-1] == ["Doceria, \"Doce\" Lar", "98.765.432/0001-10", ""]
+    assert len(rows) == 4
+
+
+def test_csv_stream_is_chunked(monkeypatch):
+    monkeypatch.setattr(export, "CSV_CHUNK_SIZE", 200)
+    results = [{"Título": f"Empresa {i}", "CNPJ": f"{i:02d}.345.678/0001-90", "Email": "contato@empresa.com"}
+               for i in range(50)]
+    chunks = list(export.stream("csv", results, FIELDS))
+    # Cabeçalho sozinho, depois blocos que só passam do limite pela última linha escrita
+    assert chunks[0] == "Título,CNPJ,Email\n".encode("utf-8")
+    assert len(chunks) > 5
+    assert all(len(chunk) < 200 + 100 for chunk in chunks)
+    rows = read_csv(chunks)
+    assert len(rows) == 51
+    assert rows[50] == ["Empresa 49", "49.345.678/0001-90", "contato@empresa.com"]
+
+
+def test_jsonl_stream():
+    lines = b"".join(export.stream("jsonl", RESULTS, FIELDS)).decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines][0] == {
+        "Título": "Padaria Bela", "CNPJ": "12.345.678/0001-90", "Email": "a@bela.com"}
+    assert len(lines) == 3
+
+
+def test_parquet_stream_reads_back(monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(export, "PARQUET_ROW_GROUP", 2)
+    results = RESULTS + [{"Título": f"Empresa {i}", "CNPJ": f"{i:02d}.111.222/0001-33"} for i in range(3)]
+    chunks = list(export.stream("parquet", results, FIELDS))
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+    assert parquet.num_row_groups == 3
+    table = parquet.read()
+    assert table.column_names == FIELDS
+    assert table.column("Título").to_pylist() == [
+        "Padaria Bela", "Sem CNPJ", "Doceria, \"Doce\" Lar", "Empresa 0", "Empresa 1", "Empresa 2"]
+    assert table.column("Email").to_pylist()[:2] == ["a@bela.com", ""]
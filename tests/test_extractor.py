@@ -0,0 +1,69 @@
+import extractor
+from extractor import extract_from_text
+
+
+def test_first_match_of_each_field_wins():
+    details = extract_from_text("CNPJ 12.345.678/0001-90, filial 98.765.432/0001-10. "
+                                "Fone (11) 3333-4444 ou (21) 2222-1111. contato@padaria.com")
+    assert details["CNPJ"] == "12.345.678/0001-90"
+    assert details["Telefone"] == "(11) 3333-4444"
+    assert details["Email"] == "contato@padaria.com"
+
+
+def test_email_domain_is_not_a_website():
+    details = extract_from_text("Escreva para vendas@padaria.com")
+    assert details["Email"] == "vendas@padaria.com"
+    assert details["Website"] == "N/A"
+
+    details = extract_from_text("vendas@padaria.com ou visite www.padariabela.com")
+    assert details["Website"] == "www.padariabela.com"
+
+
+def test_mobile_phone_counts_as_whatsapp():
+    details = extract_from_text("Fixo (11) 3333-4444, celular (11) 98765-4321")
+    assert details["Telefone"] == "(11) 3333-4444"
+    assert details["WhatsApp"] == "(11) 98765-4321"
+
+
+def test_whatsapp_link_in_text_comes_before_a_later_mobile():
+    details = extract_from_text("Chame em wa.me/5511987654321 ou ligue (11) 91234-5678")
+    assert details["WhatsApp"] == "wa.me/5511987654321"
+    assert details["Telefone"] == "(11) 91234-5678"
+
+
+def test_social_links():
+    details = extract_from_text("", ["https://www.instagram.com/padaria", "https://g.page/padaria",
+                                     "https://br.linkedin.com/company/padaria", "/contato"])
+    assert details["Instagram"] == "https://www.instagram.com/padaria"
+    assert details["Google Meu Negócio"] == "https://g.page/padaria"
+    assert details["LinkedIn"] == "https://br.linkedin.com/company/padaria"
+    assert details["WhatsApp"] == "N/A"
+
+
+def test_city_match_ignores_accents_and_case():
+    assert extract_from_text("Av. Brasil, 100 - SAO JOSE DOS CAMPOS/SP", state="SP")["Localização"] == "São José dos Campos"
+    assert extract_from_text("Rua X, centro, maracanau - ce", state="CE")["Localização"] == "Maracanaú"
+
+
+def test_city_listed_first_in_the_state_wins():
+    # "São Paulo" vem antes de "Santos" na lista de SP, mesmo aparecendo depois no texto
+    assert extract_from_text("Lojas em Santos e em São Paulo", state="SP")["Localização"] == "São Paulo"
+
+
+def test_city_from_another_state_is_not_a_location():
+    assert extract_from_text("Rua X, Fortaleza - CE", state="SP")["Localização"] == "N/A"
+    assert extract_from_text("Rua X, Fortaleza - CE")["Localização"] == "N/A"
+
+
+def test_fold():
+    assert extractor.fold("São JOSÉ dos Campos") == "sao jose dos campos"
+
+
+def test_extract_parses_html():
+    html = ("<html><head><style>.x{}</style></head><body><p>Padaria Bela LTDA</p>"
+            "<p>CNPJ: 12.345.678/0001-90 - Campinas, SP</p>"
+            "<a href='https://instagram.com/padariabela'>Instagram</a></body></html>")
+    details = extractor.extract(html, "SP")
+    assert details["CNPJ"] == "12.345.678/0001-90"
+    assert details["Localização"] == "Campinas"
+    assert details["Instagram"] == "https://instagram.com/padariabela"
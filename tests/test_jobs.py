@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+from jobs import DuplicateSearch, JobRegistry
+
+ARGS = ("padaria", ["São Paulo"], "SP", 5, 2)
+
+
+def test_duplicate_key_is_rejected_while_the_first_search_runs():
+    registry = JobRegistry(max_running=5, max_finished=5)
+    first = registry.create(*ARGS, key="k")
+    assert first.key == "k"
+    with pytest.raises(DuplicateSearch):
+        registry.create(*ARGS, key="k")
+    assert registry.create(*ARGS, key="outra") is not None
+
+
+def test_running_limit():
+    registry = JobRegistry(max_running=1, max_finished=5)
+    assert registry.create(*ARGS) is not None
+    assert registry.create(*ARGS) is None
+
+
+def test_concurrent_creates_with_the_same_key_start_one_search():
+    registry = JobRegistry(max_running=50, max_finished=5)
+    barrier = threading.Barrier(16)
+    created, rejected = [], []
+
+    def create():
+        barrier.wait()
+        try:
+            created.append(registry.create(*ARGS, key="k"))
+        except DuplicateSearch:
+            rejected.append(True)
+
+    threads = [threading.Thread(target=create) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (len(created), len(rejected)) == (1, 15)
@@ -0,0 +1,35 @@
+import pytest
+
+import parsers
+
+BACKENDS = parsers.available_backends()
+
+XML_PAGE = ('<?xml version="1.0" encoding="ISO-8859-1"?>\n'
+            '<html><head><meta charset="iso-8859-1"><script>var x = 1;</script></head>'
+            '<body><p>Padaria São João</p><a href="https://instagram.com/sj">ig</a></body></html>')
+SERP = ('<html><body><ol id="b_results">'
+        '<li class="b_algo"><h2><a href="https://cnpj.biz/12345678000190">Padaria Bela</a></h2></li>'
+        '<li class="b_algo"><h2>Sem link</h2></li>'
+        '</ol></body></html>')
+
+
+@pytest.fixture(params=BACKENDS, ids=[backend.name for backend in BACKENDS])
+def backend(request):
+    return request.param
+
+
+def test_page_with_xml_declaration(backend):
+    text, links = backend.page(XML_PAGE)
+    assert "Padaria São João" in text
+    assert "var x" not in text
+    assert links == ["https://instagram.com/sj"]
+
+
+def test_serp_with_xml_declaration(backend):
+    items, _ = backend.serp('<?xml version="1.0" encoding="utf-8"?>\n' + SERP)
+    assert items == [("Padaria Bela", "https://cnpj.biz/12345678000190"), ("Sem link", "N/A")]
+
+
+def test_empty_page(backend):
+    assert backend.page("") == ("", [])
+    assert backend.serp("")[0] == []
@@ -0,0 +1,81 @@
+import asyncio
+
+from planner import QueryPlan
+
+
+def take(plan):
+    return asyncio.run(plan.next())
+
+
+def test_untried_branches_follow_the_site_priors():
+    plan = QueryPlan(["A"], ["fraco", "forte"], 3, priors={"fraco": 1, "forte": 8})
+    unit = take(plan)
+    assert (unit.branch.site, unit.page, unit.key) == ("forte", 1, "A|forte|1")
+
+
+def test_branch_paginates_until_max_pages():
+    plan = QueryPlan(["A"], ["s"], 2)
+    pages = []
+    while (unit := take(plan)) is not None:
+        pages.append(unit.page)
+        plan.report(unit, 5)
+    assert pages == [1, 2]
+    assert plan.summary()[0]["stopped_early"] is False
+
+
+def test_page_without_new_cnpjs_stops_the_branch():
+    plan = QueryPlan(["A"], ["s"], 5)
+    plan.report(take(plan), 3)
+    plan.report(take(plan), 0)
+    assert take(plan) is None
+    assert plan.summary()[0] == {"city": "A", "site": "s", "pages": 2, "new_cnpjs": 3, "failed": False,
+                                 "stopped_early": True}
+
+
+def test_page_with_no_information_does_not_stop_the_branch():
+    plan = QueryPlan(["A"], ["s"], 5)
+    plan.report(take(plan), None)
+    unit = take(plan)
+    assert unit.page == 2
+    assert plan.summary()[0]["pages"] == 0
+
+
+def test_failed_page_leaves_the_branch_for_the_checkpoint():
+    plan = QueryPlan(["A"], ["s", "t"], 5, priors={"s": 9, "t": 1})
+    plan.report(take(plan), None, failed=True)
+    unit = take(plan)
+    assert unit.branch.site == "t"
+    plan.report(unit, 0)
+    assert take(plan) is None
+    assert {branch["site"]: branch["failed"] for branch in plan.summary()} == {"s": True, "t": False}
+
+
+def test_next_waits_for_the_page_in_flight():
+    async def scenario():
+        plan = QueryPlan(["A"], ["s"], 3)
+        first = await plan.next()
+        waiting = asyncio.ensure_future(plan.next())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        plan.report(first, 4)
+        return await waiting
+
+    assert asyncio.run(scenario()).page == 2
+
+
+def test_resume_skips_done_pages_and_keeps_their_yield():
+    plan = QueryPlan(["A"], ["s", "t"], 5, priors={"s": 1, "t": 1}, done={"A|s|1": 10, "A|s|2": 8})
+    unit = take(plan)
+    assert (unit.branch.site, unit.page) == ("s", 3)
+    assert unit.branch.pages_done == 2 and unit.branch.new_cnpjs == 18
+
+
+def test_resume_keeps_the_early_stop():
+    plan = QueryPlan(["A"], ["s"], 5, done={"A|s|1": 4, "A|s|2": 0})
+    assert take(plan) is None
+    assert plan.summary()[0]["stopped_early"] is True
+
+
+def test_resume_after_a_page_with_no_information():
+    plan = QueryPlan(["A"], ["s"], 5, done={"A|s|1": None})
+    assert take(plan).page == 2
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import ratelimit
+from ratelimit import AimdLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Só o relógio do ratelimit é trocado; o event loop continua com o time.monotonic de verdade
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def run_requests(limiter, count, **outcome):
+    async def scenario():
+        for _ in range(count):
+            await limiter.acquire()
+            limiter.release(**outcome)
+    asyncio.run(scenario())
+
+
+def test_fast_responses_increase_the_limit_additively():
+    limiter = AimdLimiter(4, 1, 16, latency_target=3)
+    run_requests(limiter, 4, latency=0.1)
+    # +1/limite por resposta: uma rodada completa de 4 respostas soma ≈ 1
+    assert 4.9 < limiter.limit < 5
+
+
+def test_overload_halves_the_limit_once_per_window(clock):
+    limiter = AimdLimiter(8, 1, 16, latency_target=3)
+    run_requests(limiter, 3, overloaded=True)
+    assert limiter.limit == 4
+    clock[0] += 3
+    run_requests(limiter, 1, latency=5)
+    assert limiter.limit == 2
+
+
+def test_errors_without_latency_do_not_increase_the_limit():
+    limiter = AimdLimiter(4, 1, 16, latency_target=3)
+    run_requests(limiter, 5)
+    assert limiter.limit == 4
+
+
+def test_limit_stays_within_bounds(clock):
+    limiter = AimdLimiter(4, 2, 6, latency_target=3)
+    for _ in range(5):
+        clock[0] += 3
+        run_requests(limiter, 1, overloaded=True)
+    assert limiter.limit == 2
+    run_requests(limiter, 100, latency=0.1)
+    assert limiter.limit == 6
+    assert AimdLimiter(50, 1, 6, latency_target=3).limit == 6
+
+
+def test_release_wakes_a_waiter():
+    async def scenario():
+        limiter = AimdLimiter(1, 1, 4, latency_target=3)
+        await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiting.done() and len(limiter.waiters) == 1
+        limiter.release()
+        await asyncio.wait_for(waiting, 1)
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 1
+    assert not limiter.waiters
+
+
+def test_bucket_allows_a_burst_then_paces():
+    async def scenario():
+        bucket = TokenBucket(rate=20, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        burst = time.monotonic() - start
+        await bucket.acquire()
+        return burst, time.monotonic() - start
+
+    burst, total = asyncio.run(scenario())
+    assert burst < 0.02
+    assert total >= 0.04
+
+
+def test_block_holds_back_acquire():
+    async def scenario():
+        bucket = TokenBucket(rate=1000, burst=10)
+        bucket.block(0.1)
+        start = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(scenario()) >= 0.09
+
+
+def test_zero_rate_disables_the_bucket():
+    async def scenario():
+        bucket = TokenBucket(rate=0, burst=1)
+        bucket.block(10)
+        await asyncio.wait_for(bucket.acquire(), 0.1)
+
+    asyncio.run(scenario())
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+from transport import Response, Transport, detect_encoding
+
+LATIN1_META = '<html><head><meta charset="iso-8859-1"></head><body>São Paulo</body></html>'.encode("latin-1")
+LATIN1_HTTP_EQUIV = ('<html><head><meta http-equiv="Content-Type" content="text/html; charset=windows-1252">'
+                     '</head><body>Ação</body></html>').encode("cp1252")
+
+
+def response(content, charset=None):
+    return Response("http://exemplo", 200, {}, content, charset)
+
+
+def test_header_charset_wins():
+    assert response("São Paulo".encode("latin-1"), "iso-8859-1").text == "São Paulo"
+    assert response("São Paulo".encode("utf-8"), "utf-8").text == "São Paulo"
+
+
+def test_meta_charset_when_header_has_none():
+    assert "São Paulo" in response(LATIN1_META).text
+    assert "Ação" in response(LATIN1_HTTP_EQUIV).text
+
+
+def test_xml_declaration():
+    content = '<?xml version="1.0" encoding="ISO-8859-1"?><html><body>Goiânia</body></html>'.encode("latin-1")
+    assert "Goiânia" in response(content).text
+
+
+def test_undeclared_utf8_and_latin1():
+    assert response("<p>Ribeirão Preto</p>".encode("utf-8")).text == "<p>Ribeirão Preto</p>"
+    assert response("<p>Ribeirão Preto</p>".encode("latin-1")).text == "<p>Ribeirão Preto</p>"
+
+
+def test_unknown_charsets_are_ignored():
+    assert detect_encoding("São".encode("utf-8"), "x-desconhecido") == "utf-8"
+    assert detect_encoding(b'<meta charset="x-desconhecido">ok') == "utf-8"
+
+
+def test_utf8_bom():
+    assert response("﻿<p>São</p>".encode("utf-8")).text == "<p>São</p>"
+
+
+def test_long_retry_after_is_capped():
+    async def scenario():
+        calls = []
+
+        async def limited(request):
+            calls.append(request.path)
+            return web.Response(status=429, headers={"Retry-After": "3600"})
+
+        app = web.Application()
+        app.router.add_get("/", limited)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        transport = Transport(max_retries=3, max_retry_after=2)
+        try:
+            start = time.monotonic()
+            response = await transport.get(f"http://127.0.0.1:{port}/")
+            elapsed = time.monotonic() - start
+            blocked_for = transport.throttle("127.0.0.1").bucket.blocked_until - time.monotonic()
+        finally:
+            await transport.close()
+            await runner.cleanup()
+        return response.status, len(calls), elapsed, blocked_for
+
+    status, calls, elapsed, blocked_for = asyncio.run(scenario())
+    assert (status, calls) == (429, 1)
+    assert elapsed < 1
+    assert 0 < blocked_for <= 2
@@ -0,0 +1,207 @@
+import asyncio
+import codecs
+import json
+import random
+import re
+import time
+from collections import Counter, OrderedDict
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import config
+from ratelimit import HostThrottle, host_budget
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Respostas que indicam que o host está sobrecarregado ou limitando o ritmo
+OVERLOAD_STATUSES = {429, 503}
+
+# Codificação declarada no próprio documento, procurada no começo do corpo quando o cabeçalho não traz charset
+XML_ENCODING = re.compile(rb'^\s*<\?xml[^>]*encoding=["\']?([\w.:-]+)', re.I)
+META_CHARSET = re.compile(rb'<meta[^>]*charset\s*=\s*["\']?([\w.:-]+)', re.I)
+
+
+def _valid_encoding(name):
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def detect_encoding(content, charset=None):
+    """Codificação do corpo: charset do cabeçalho, BOM, <?xml encoding>/<meta charset>, UTF-8 e, por fim, cp1252."""
+    if charset and _valid_encoding(charset):
+        return charset
+    if content.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    head = content[:4096]
+    match = XML_ENCODING.match(head) or META_CHARSET.search(head)
+    if match:
+        declared = _valid_encoding(match.group(1).decode("ascii"))
+        if declared:
+            return declared
+    try:
+        content.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        # Páginas brasileiras sem declaração quase sempre são Latin-1/Windows-1252
+        return "cp1252"
+
+
+class HTTPStatusError(aiohttp.ClientError):
+    def __init__(self, response):
+        super().__init__(f"{response.status} para {response.url}")
+        self.response = response
+
+
+class Response:
+    """Resposta já lida por completo, para que a conexão volte logo ao pool."""
+
+    def __init__(self, url, status, headers, content, charset):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+        self.charset = charset
+
+    @property
+    def encoding(self):
+        return detect_encoding(self.content, self.charset)
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HTTPStatusError(self)
+
+
+class Transport:
+    """Sessões HTTP com keep-alive e pool de conexões, uma para cada host.
+
+    O proxy vai em cada requisição (o pool do aiohttp já separa as conexões por proxy), e só as
+    `max_sessions` sessões usadas mais recentemente ficam abertas: as demais são fechadas assim
+    que não têm requisições em andamento. Deve ser usado sempre a partir do mesmo event loop. Respostas 429/5xx e erros de
+    conexão são repetidos com backoff exponencial antes de chegar a quem chamou. Cada host
+    tem seu ritmo (token bucket) e sua concorrência adaptativa (AIMD) — ver ratelimit.py.
+    """
+
+    def __init__(self, headers=None, timeout=config.REQUEST_TIMEOUT, pool_size=config.POOL_SIZE,
+                 per_host_limit=config.PER_HOST_LIMIT, max_retries=config.MAX_RETRIES,
+                 backoff=config.RETRY_BACKOFF, max_sessions=config.MAX_SESSIONS,
+                 max_retry_after=config.MAX_RETRY_AFTER):
+        self.headers = headers or {}
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_sessions = max_sessions
+        self.max_retry_after = max_retry_after
+        self.sessions = OrderedDict()
+        # Requisições em andamento por host; sessões em uso nunca são fechadas
+        self.active = Counter()
+        self.throttles = {}
+
+    def session_for(self, host):
+        session = self.sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.per_host_limit,
+                                             keepalive_timeout=config.KEEPALIVE_TIMEOUT, ttl_dns_cache=300)
+            session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout, connector=connector)
+            self.sessions[host] = session
+        self.sessions.move_to_end(host)
+        return session
+
+    async def evict_sessions(self):
+        """Fecha as sessões menos usadas recentemente além de `max_sessions`, pulando as que estão em uso."""
+        for host in list(self.sessions):
+            if len(self.sessions) <= self.max_sessions:
+                break
+            # Outra chamada pode ter fechado a sessão enquanto esta esperava um close()
+            if self.active[host] or host not in self.sessions:
+                continue
+            await self.sessions.pop(host).close()
+
+    def throttle(self, host):
+        # O limite vale para o host como um todo, somando todas as sessões (proxies) que o acessam
+        name, rate, burst = host_budget(host or "")
+        if name not in self.throttles:
+            self.throttles[name] = HostThrottle(name, rate, burst, self.per_host_limit)
+        return self.throttles[name]
+
+    def throttle_summary(self):
+        return [throttle.summary() for throttle in list(self.throttles.values())]
+
+    @staticmethod
+    def retry_after(response):
+        value = response.headers.get("Retry-After") if response is not None else None
+        return float(value) if value and value.isdigit() else None
+
+    def retry_delay(self, attempt, response=None):
+        retry_after = self.retry_after(response)
+        if retry_after is not None:
+            return retry_after
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    async def request(self, method, url, proxy=None, retries=None, throttled=True, **kwargs):
+        """`throttled=False` ignora os limites do host (ex.: teste de proxies, que mede o proxy e não o host)."""
+        retries = self.max_retries if retries is None else retries
+        host = urlsplit(url).hostname
+        session = self.session_for(host)
+        self.active[host] += 1
+        try:
+            await self.evict_sessions()
+            return await self._send(session, method, url, proxy, retries, self.throttle(host) if throttled else None,
+                                    **kwargs)
+        finally:
+            self.active[host] -= 1
+            if not self.active[host]:
+                del self.active[host]
+
+    async def _send(self, session, method, url, proxy, retries, throttle, **kwargs):
+        attempt = 0
+        while True:
+            if throttle:
+                await throttle.acquire()
+            start = time.monotonic()
+            try:
+                async with session.request(method, url, proxy=proxy, **kwargs) as resp:
+                    response = Response(str(resp.url), resp.status, resp.headers, await resp.read(), resp.charset)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # Timeout é sinal de sobrecarga; erro de conexão (proxy ruim, DNS) não diz nada sobre o host
+                if throttle:
+                    throttle.release(overloaded=isinstance(e, asyncio.TimeoutError))
+                if attempt >= retries:
+                    raise
+                await asyncio.sleep(self.retry_delay(attempt))
+            except BaseException:
+                if throttle:
+                    throttle.release()
+                raise
+            else:
+                retry_after = self.retry_after(response)
+                if throttle:
+                    overloaded = response.status in OVERLOAD_STATUSES
+                    latency = time.monotonic() - start if response.status < 500 else None
+                    block = min(retry_after, self.max_retry_after) if overloaded and retry_after else None
+                    throttle.release(latency, overloaded, block)
+                if response.status not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                if retry_after is not None and retry_after > self.max_retry_after:
+                    # Esperar tanto prenderia a busca (e o /stop_search) por minutos ou horas: desiste desta requisição
+                    return response
+                await asyncio.sleep(self.retry_delay(attempt, response))
+            attempt += 1
+
+    async def get(self, url, proxy=None, retries=None, **kwargs):
+        return await self.request("GET", url, proxy=proxy, retries=retries, **kwargs)
+
+    async def close(self):
+        for session in list(self.sessions.values()):
+            await session.close()
+        self.sessions.clear()
@@ -0,0 +1,6 @@
+"""Ponto de entrada WSGI para o gunicorn e outros servidores: `gunicorn wsgi:application`
+(ou `gunicorn "app:create_app()"`). No Passenger, o equivalente é o passenger_wsgi.py.
+"""
+from app import create_app
+
+application = create_app()